@@ -20,6 +20,17 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from src.pipeline import migrate, PipelineConfig, MigrationPipeline
 
 
+def _worker_count(value: str) -> int:
+    """argparse type for --workers: an integer of at least 1."""
+    try:
+        count = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid worker count: {value!r}")
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"worker count must be at least 1, got {count}")
+    return count
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Migrate Tableau TWBX workbooks to Power BI PBIP projects',
@@ -72,6 +83,19 @@ Output:
         help='Suppress progress messages'
     )
     
+    parser.add_argument(
+        '--workers', '-j',
+        type=_worker_count,
+        default=1,
+        help='Worker processes when migrating a directory (default: 1, serial)'
+    )
+    
+    parser.add_argument(
+        '--blake2b-page-ids',
+        action='store_true',
+        help='Derive page IDs with BLAKE2b instead of MD5 (changes IDs of existing projects)'
+    )
+    
     args = parser.parse_args()
     
     # Validate input
@@ -99,7 +123,9 @@ Output:
         output_path=args.output,
         template_path=args.template,
         save_intermediate=not args.no_intermediate,
-        verbose=not args.quiet
+        verbose=not args.quiet,
+        max_workers=args.workers,
+        blake2b_page_ids=args.blake2b_page_ids
     )
     
     # Summary
@@ -7,8 +7,7 @@ Extracts semantic schema from Tableau workbook files (.twbx and .twb).
 import os
 import re
 import zipfile
-import tempfile
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, IO
 from xml.etree import ElementTree as ET
 
 from ..models.tableau_schema import (
@@ -29,7 +28,6 @@ class TableauExtractor:
     def __init__(self, file_path: str):
         self.file_path = file_path
         self.workbook: Optional[TableauWorkbook] = None
-        self._temp_dir: Optional[str] = None
         
     def extract(self) -> TableauWorkbook:
         """
@@ -53,15 +51,13 @@ class TableauExtractor:
             if not twb_files:
                 raise ValueError("No .twb file found in .twbx package")
             
-            # Extract to temp directory
-            self._temp_dir = tempfile.mkdtemp()
-            twb_path = zf.extract(twb_files[0], self._temp_dir)
-            
-            return self._extract_from_twb(twb_path)
+            # Parse the .twb straight from the archive (no temp extraction)
+            with zf.open(twb_files[0]) as twb_file:
+                return self._extract_from_twb(twb_file)
     
-    def _extract_from_twb(self, twb_path: str) -> TableauWorkbook:
-        """Extract from XML workbook file (.twb)."""
-        tree = ET.parse(twb_path)
+    def _extract_from_twb(self, twb_source: Union[str, IO[bytes]]) -> TableauWorkbook:
+        """Extract from XML workbook file (.twb) given a path or open file."""
+        tree = ET.parse(twb_source)
         root = tree.getroot()
         
         workbook_name = os.path.splitext(os.path.basename(self.file_path))[0]
@@ -127,6 +123,8 @@ class TableauExtractor:
         """Extract logical tables from a datasource."""
         tables = []
         table_map: Dict[str, TableauTable] = {}
+        # Column names already added per table, for O(1) duplicate checks
+        column_names: Dict[str, set] = {}
         
         # Look for columns which define the schema
         for col_elem in ds_elem.findall('.//column'):
@@ -151,6 +149,7 @@ class TableauExtractor:
                     name=parent_name,
                     caption=parent_name
                 )
+                column_names[parent_name] = set()
             
             table = table_map[parent_name]
             
@@ -163,6 +162,7 @@ class TableauExtractor:
                 continue
             
             table.columns.append(column)
+            column_names[parent_name].add(col_name)
         
         # Also look for metadata-records which contain column info
         for metadata in ds_elem.findall('.//metadata-record'):
@@ -184,9 +184,10 @@ class TableauExtractor:
                             name=parent_name,
                             caption=parent_name
                         )
+                        column_names[parent_name] = set()
                     
                     # Check if column already exists
-                    existing_cols = [c.name for c in table_map[parent_name].columns]
+                    existing_cols = column_names[parent_name]
                     if col_name not in existing_cols:
                         datatype = self._infer_datatype(metadata)
                         column = TableauColumn(
@@ -196,6 +197,7 @@ class TableauExtractor:
                             source_table=parent_name
                         )
                         table_map[parent_name].columns.append(column)
+                        existing_cols.add(col_name)
         
         tables = list(table_map.values())
         
@@ -583,7 +585,8 @@ class TableauExtractor:
         return parameters
     
     def cleanup(self):
-        """Clean up temporary files."""
-        if self._temp_dir and os.path.exists(self._temp_dir):
-            import shutil
-            shutil.rmtree(self._temp_dir)
+        """Clean up temporary files.
+        
+        Packaged workbooks are read directly from the archive, so nothing is
+        written to disk; kept so callers can release the extractor uniformly.
+        """
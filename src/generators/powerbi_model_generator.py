@@ -7,18 +7,39 @@ Creates offline/disconnected models with placeholder tables (no data loading).
 
 import os
 import json
-import hashlib
-from typing import List, Optional
+import functools
+from typing import List, Optional, Tuple
 
 from ..models.canonical_schema import (
     CanonicalReport, CanonicalDataset, CanonicalTable, CanonicalColumn,
     CanonicalMeasure, DataType, ConfidenceLevel
 )
 from ..models.powerbi_schema import (
-    PBISemanticModel, PBITable, PBIColumn, PBIMeasure
+    PBISemanticModel, PBITable, PBIColumn, PBIMeasure, _lineage_tag_for
 )
 
 
+# Static artifacts that never depend on the model, encoded once at import
+_PBISM_JSON = json.dumps({
+    "version": "4.2",
+    "settings": {}
+}, indent=2).encode('utf-8')
+
+_LOCAL_SETTINGS_JSON = json.dumps({
+    "version": "1.0"
+}, indent=2).encode('utf-8')
+
+# editorSettings.json - must match Power BI expected format
+_EDITOR_SETTINGS_JSON = json.dumps({
+    "version": "1.0",
+    "autodetectRelationships": True,
+    "parallelQueryLoading": True,
+    "typeDetectionEnabled": True,
+    "relationshipImportEnabled": True,
+    "shouldNotifyUserOfNameConflictResolution": True
+}, indent=2).encode('utf-8')
+
+
 class PowerBIModelGenerator:
     """
     Generates Power BI semantic model artifacts (.tmdl files).
@@ -87,7 +108,7 @@ class PowerBIModelGenerator:
         
         for canonical_table in dataset.tables:
             pbi_table = self._convert_table(canonical_table)
-            model.tables.append(pbi_table)
+            model.add_table(pbi_table)
         
         return model
     
@@ -159,14 +180,9 @@ class PowerBIModelGenerator:
     
     def _generate_pbism(self):
         """Generate definition.pbism file."""
-        pbism = {
-            "version": "4.2",
-            "settings": {}
-        }
-        
         pbism_path = os.path.join(self.output_path, 'definition.pbism')
-        with open(pbism_path, 'w', encoding='utf-8') as f:
-            json.dump(pbism, f, indent=2)
+        with open(pbism_path, 'wb') as f:
+            f.write(_PBISM_JSON)
     
     def _generate_database_tmdl(self):
         """Generate database.tmdl file."""
@@ -230,14 +246,30 @@ ref cultureInfo {self.model.culture}
     
     def _generate_table_tmdl(self, table: PBITable) -> str:
         """Generate TMDL content for a single table using calculated table format."""
-        lineage_tag = self._generate_lineage_tag(table.name)
+        # Render from a hashable snapshot so repeated identical tables
+        # (same workbook migrated again, placeholder tables) hit the cache
+        columns = tuple(
+            (col.name, col.data_type, col.source_column) for col in table.columns
+        )
+        measures = tuple(
+            (measure.name, measure.expression) for measure in table.measures
+        )
+        return self._render_table_tmdl(table.name, columns, measures)
+    
+    @classmethod
+    @functools.lru_cache(maxsize=64)
+    def _render_table_tmdl(cls, table_name: str,
+                           columns: Tuple[Tuple[str, str, Optional[str]], ...],
+                           measures: Tuple[Tuple[str, str], ...]) -> str:
+        """Render table TMDL from hashable column/measure tuples (memoized)."""
+        lineage_tag = cls._generate_lineage_tag(table_name)
         
         # Use calculated table format - this works without data source
         # Generate DAX to create an empty table with schema
         dax_columns = []
-        for col in table.columns:
-            dax_type = self._data_type_to_dax_type(col.data_type)
-            dax_columns.append(f'"{col.name}", {dax_type}')
+        for col_name, data_type, _ in columns:
+            dax_type = cls._data_type_to_dax_type(data_type)
+            dax_columns.append(f'"{col_name}", {dax_type}')
         
         if dax_columns:
             table_dax = 'DATATABLE(' + ', '.join(dax_columns) + ')'
@@ -245,32 +277,32 @@ ref cultureInfo {self.model.culture}
             table_dax = 'DATATABLE("Value", STRING)'
         
         lines = [
-            f'table \'{table.name}\'',
+            f'table \'{table_name}\'',
             f'\tlineageTag: {lineage_tag}',
             ''
         ]
         
         # Add columns
-        for col in table.columns:
-            col_lineage = self._generate_lineage_tag(f"{table.name}_{col.name}")
+        for col_name, data_type, source_column in columns:
+            col_lineage = cls._generate_lineage_tag(f"{table_name}_{col_name}")
             lines.extend([
-                f'\tcolumn \'{col.name}\'',
-                f'\t\tdataType: {col.data_type}',
+                f'\tcolumn \'{col_name}\'',
+                f'\t\tdataType: {data_type}',
                 f'\t\tlineageTag: {col_lineage}',
                 f'\t\tsummarizeBy: none',
-                f'\t\tsourceColumn: {col.source_column or col.name}',
+                f'\t\tsourceColumn: {source_column or col_name}',
                 '',
                 f'\t\tannotation SummarizationSetBy = Automatic',
                 ''
             ])
         
         # Add measures
-        for measure in table.measures:
-            measure_lineage = self._generate_lineage_tag(f"{table.name}_{measure.name}")
+        for measure_name, expression in measures:
+            measure_lineage = cls._generate_lineage_tag(f"{table_name}_{measure_name}")
             # Clean expression for TMDL (handle multi-line)
-            expr = measure.expression.replace('\n', ' ').replace('\t', ' ')
+            expr = expression.replace('\n', ' ').replace('\t', ' ')
             lines.extend([
-                f'\tmeasure \'{measure.name}\' = {expr}',
+                f'\tmeasure \'{measure_name}\' = {expr}',
                 f'\t\tlineageTag: {measure_lineage}',
                 ''
             ])
@@ -278,16 +310,16 @@ ref cultureInfo {self.model.culture}
         # Add partition with M query - use triple-quoted string format for TMDL
         # Build column type definitions for M query
         col_defs = []
-        for col in table.columns:
-            m_type = self._data_type_to_m_type(col.data_type)
-            col_defs.append(f'{{"{col.name}", {m_type}}}')
+        for col_name, data_type, _ in columns:
+            m_type = cls._data_type_to_m_type(data_type)
+            col_defs.append(f'{{"{col_name}", {m_type}}}')
         
         if not col_defs:
             col_defs = ['{"Value", type text}']
         
         type_list = ", ".join(col_defs)
         
-        lines.append(f'\tpartition \'{table.name}\' = m')
+        lines.append(f'\tpartition \'{table_name}\' = m')
         lines.append(f'\t\tmode: import')
         lines.append(f'\t\tsource =')
         lines.append(f'\t\t\t\tlet Source = #table({{{type_list}}}, {{}}) in Source')
@@ -302,7 +334,8 @@ ref cultureInfo {self.model.culture}
         
         return '\n'.join(lines)
     
-    def _data_type_to_m_type(self, data_type: str) -> str:
+    @staticmethod
+    def _data_type_to_m_type(data_type: str) -> str:
         """Convert Power BI data type to M type."""
         type_map = {
             'string': 'type text',
@@ -315,7 +348,8 @@ ref cultureInfo {self.model.culture}
         }
         return type_map.get(data_type, 'type text')
     
-    def _data_type_to_dax_type(self, data_type: str) -> str:
+    @staticmethod
+    def _data_type_to_dax_type(data_type: str) -> str:
         """Convert Power BI data type to DAX type for DATATABLE."""
         type_map = {
             'string': 'STRING',
@@ -389,28 +423,15 @@ ref cultureInfo {self.model.culture}
     
     def _generate_pbi_settings(self, pbi_path: str):
         """Generate .pbi folder settings files."""
-        # localSettings.json
-        local_settings = {
-            "version": "1.0"
-        }
         local_path = os.path.join(pbi_path, 'localSettings.json')
-        with open(local_path, 'w', encoding='utf-8') as f:
-            json.dump(local_settings, f, indent=2)
-        
-        # editorSettings.json - must match Power BI expected format
-        editor_settings = {
-            "version": "1.0",
-            "autodetectRelationships": True,
-            "parallelQueryLoading": True,
-            "typeDetectionEnabled": True,
-            "relationshipImportEnabled": True,
-            "shouldNotifyUserOfNameConflictResolution": True
-        }
+        with open(local_path, 'wb') as f:
+            f.write(_LOCAL_SETTINGS_JSON)
+        
         editor_path = os.path.join(pbi_path, 'editorSettings.json')
-        with open(editor_path, 'w', encoding='utf-8') as f:
-            json.dump(editor_settings, f, indent=2)
+        with open(editor_path, 'wb') as f:
+            f.write(_EDITOR_SETTINGS_JSON)
     
-    def _generate_lineage_tag(self, name: str) -> str:
+    @staticmethod
+    def _generate_lineage_tag(name: str) -> str:
         """Generate a deterministic lineage tag UUID."""
-        hash_bytes = hashlib.md5(name.encode()).hexdigest()
-        return f'{hash_bytes[:8]}-{hash_bytes[8:12]}-{hash_bytes[12:16]}-{hash_bytes[16:20]}-{hash_bytes[20:32]}'
+        return _lineage_tag_for(name)
@@ -16,6 +16,77 @@ from ..models.canonical_schema import (
     VisualEncoding, AggregationType
 )
 from ..models.powerbi_schema import PBIReport, PBIPage, PBIVisualConfig
+from .powerbi_model_generator import PowerBIModelGenerator
+
+
+# Static artifacts that never depend on the report, encoded once at import
+_DEFAULT_THEME_JSON = json.dumps({
+    "name": "CY25SU12",
+    "dataColors": [
+        "#118DFF", "#12239E", "#E66C37", "#6B007B", "#E044A7",
+        "#744EC2", "#D9B300", "#D64550", "#197278", "#1AAB40"
+    ],
+    "foreground": "#252423",
+    "foregroundNeutralSecondary": "#605E5C",
+    "background": "#FFFFFF",
+    "tableAccent": "#118DFF"
+}, indent=2).encode('utf-8')
+
+_REPORT_JSON = json.dumps({
+    "$schema": "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/report/3.1.0/schema.json",
+    "themeCollection": {
+        "baseTheme": {
+            "name": "CY25SU12",
+            "reportVersionAtImport": {
+                "visual": "2.5.0",
+                "report": "3.1.0",
+                "page": "2.3.0"
+            },
+            "type": "SharedResources"
+        }
+    },
+    "objects": {
+        "section": [
+            {
+                "properties": {
+                    "verticalAlignment": {
+                        "expr": {
+                            "Literal": {
+                                "Value": "'Top'"
+                            }
+                        }
+                    }
+                }
+            }
+        ]
+    },
+    "resourcePackages": [
+        {
+            "name": "SharedResources",
+            "type": "SharedResources",
+            "items": [
+                {
+                    "name": "CY25SU12",
+                    "path": "BaseThemes/CY25SU12.json",
+                    "type": "BaseTheme"
+                }
+            ]
+        }
+    ],
+    "settings": {
+        "useStylableVisualContainerHeader": True,
+        "exportDataMode": "AllowSummarized",
+        "defaultDrillFilterOtherVisuals": True,
+        "allowChangeFilterTypes": True,
+        "useEnhancedTooltips": True,
+        "useDefaultAggregateDisplayName": True
+    }
+}, indent=2).encode('utf-8')
+
+_VERSION_JSON = json.dumps({
+    "$schema": "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/versionMetadata/1.0.0/schema.json",
+    "version": "2.0.0"
+}, indent=2).encode('utf-8')
 
 
 class PowerBIReportGenerator:
@@ -280,23 +351,11 @@ class PowerBIReportGenerator:
     
     def _generate_default_theme(self):
         """Generate a default Power BI theme."""
-        theme = {
-            "name": "CY25SU12",
-            "dataColors": [
-                "#118DFF", "#12239E", "#E66C37", "#6B007B", "#E044A7",
-                "#744EC2", "#D9B300", "#D64550", "#197278", "#1AAB40"
-            ],
-            "foreground": "#252423",
-            "foregroundNeutralSecondary": "#605E5C",
-            "background": "#FFFFFF",
-            "tableAccent": "#118DFF"
-        }
-        
         theme_path = os.path.join(
             self.output_path, 'StaticResources', 'SharedResources', 'BaseThemes', 'CY25SU12.json'
         )
-        with open(theme_path, 'w', encoding='utf-8') as f:
-            json.dump(theme, f, indent=2)
+        with open(theme_path, 'wb') as f:
+            f.write(_DEFAULT_THEME_JSON)
     
     def _generate_pbir(self):
         """Generate definition.pbir file."""
@@ -315,71 +374,15 @@ class PowerBIReportGenerator:
     
     def _generate_report_json(self):
         """Generate report.json file."""
-        report_config = {
-            "$schema": "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/report/3.1.0/schema.json",
-            "themeCollection": {
-                "baseTheme": {
-                    "name": "CY25SU12",
-                    "reportVersionAtImport": {
-                        "visual": "2.5.0",
-                        "report": "3.1.0",
-                        "page": "2.3.0"
-                    },
-                    "type": "SharedResources"
-                }
-            },
-            "objects": {
-                "section": [
-                    {
-                        "properties": {
-                            "verticalAlignment": {
-                                "expr": {
-                                    "Literal": {
-                                        "Value": "'Top'"
-                                    }
-                                }
-                            }
-                        }
-                    }
-                ]
-            },
-            "resourcePackages": [
-                {
-                    "name": "SharedResources",
-                    "type": "SharedResources",
-                    "items": [
-                        {
-                            "name": "CY25SU12",
-                            "path": "BaseThemes/CY25SU12.json",
-                            "type": "BaseTheme"
-                        }
-                    ]
-                }
-            ],
-            "settings": {
-                "useStylableVisualContainerHeader": True,
-                "exportDataMode": "AllowSummarized",
-                "defaultDrillFilterOtherVisuals": True,
-                "allowChangeFilterTypes": True,
-                "useEnhancedTooltips": True,
-                "useDefaultAggregateDisplayName": True
-            }
-        }
-        
         report_path = os.path.join(self.output_path, 'definition', 'report.json')
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report_config, f, indent=2)
+        with open(report_path, 'wb') as f:
+            f.write(_REPORT_JSON)
     
     def _generate_version_json(self):
         """Generate version.json file."""
-        version = {
-            "$schema": "https://developer.microsoft.com/json-schemas/fabric/item/report/definition/versionMetadata/1.0.0/schema.json",
-            "version": "2.0.0"
-        }
-        
         version_path = os.path.join(self.output_path, 'definition', 'version.json')
-        with open(version_path, 'w', encoding='utf-8') as f:
-            json.dump(version, f, indent=2)
+        with open(version_path, 'wb') as f:
+            f.write(_VERSION_JSON)
     
     def _generate_pages_json(self):
         """Generate pages.json file."""
@@ -699,7 +702,6 @@ class PBIPProjectGenerator:
         
         # Generate semantic model
         model_folder = os.path.join(project_folder, f'{self.project_name}.SemanticModel')
-        from .powerbi_model_generator import PowerBIModelGenerator
         model_gen = PowerBIModelGenerator(model_folder)
         model_gen.generate(canonical_report)
         
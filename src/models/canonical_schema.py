@@ -3,6 +3,8 @@ Canonical BI Schema Models
 
 Defines the intermediate representation used between Tableau extraction and Power BI generation.
 This schema is platform-agnostic and can be validated at each stage.
+
+Enums are str-valued so members serialize to JSON as their value directly.
 """
 
 from dataclasses import dataclass, field
@@ -10,8 +12,10 @@ from typing import List, Dict, Optional, Any
 from enum import Enum
 import json
 
+from .name_index import NameIndex
+
 
-class ConfidenceLevel(Enum):
+class ConfidenceLevel(str, Enum):
     """Confidence level for translations."""
     HIGH = "high"  # Direct 1:1 mapping
     MEDIUM = "medium"  # Translation with minor adjustments
@@ -19,7 +23,7 @@ class ConfidenceLevel(Enum):
     UNSUPPORTED = "unsupported"  # Cannot be translated
 
 
-class DataType(Enum):
+class DataType(str, Enum):
     """Platform-agnostic data types."""
     STRING = "string"
     INTEGER = "int64"
@@ -31,7 +35,7 @@ class DataType(Enum):
     BINARY = "binary"
 
 
-class AggregationType(Enum):
+class AggregationType(str, Enum):
     """Aggregation types."""
     SUM = "sum"
     COUNT = "count"
@@ -45,7 +49,7 @@ class AggregationType(Enum):
     NONE = "none"
 
 
-class VisualType(Enum):
+class VisualType(str, Enum):
     """Platform-agnostic visual types."""
     BAR_CHART = "bar_chart"
     CLUSTERED_BAR = "clustered_bar"
@@ -69,7 +73,7 @@ class VisualType(Enum):
     UNKNOWN = "unknown"
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalColumn:
     """A platform-agnostic column definition."""
     name: str
@@ -81,7 +85,7 @@ class CanonicalColumn:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalMeasure:
     """A platform-agnostic measure definition."""
     name: str
@@ -100,15 +104,15 @@ class CanonicalMeasure:
             "display_name": self.display_name,
             "expression": self.expression,
             "dax_expression": self.dax_expression,
-            "confidence": self.confidence.value,
-            "aggregation": self.aggregation.value,
+            "confidence": self.confidence,
+            "aggregation": self.aggregation,
             "format_string": self.format_string,
             "description": self.description,
             "unsupported_reason": self.unsupported_reason
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalTable:
     """A platform-agnostic table definition."""
     name: str
@@ -120,7 +124,7 @@ class CanonicalTable:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CanonicalRelationship:
     """A relationship between two tables."""
     from_table: str
@@ -131,22 +135,37 @@ class CanonicalRelationship:
     cardinality: str = "many-to-one"  # many-to-one, one-to-many, one-to-one, many-to-many
 
 
-@dataclass
-class CanonicalDataset:
+class _TableIndexSlot:
+    """Holds the table name index outside the dataclass fields."""
+    __slots__ = ('_table_index',)
+
+
+@dataclass(slots=True)
+class CanonicalDataset(_TableIndexSlot):
     """A platform-agnostic dataset/model definition."""
     name: str
     tables: List[CanonicalTable] = field(default_factory=list)
     relationships: List[CanonicalRelationship] = field(default_factory=list)
     description: Optional[str] = None
     
+    def __post_init__(self):
+        # Lazily built name -> table index (see get_table_by_name); a plain
+        # slot, so fields(), asdict(), repr and == don't see it
+        self._table_index = NameIndex()
+    
     def get_table_by_name(self, name: str) -> Optional[CanonicalTable]:
-        for table in self.tables:
-            if table.name == name:
-                return table
-        return None
+        return self._table_index.get(self.tables, name)
+    
+    def add_table(self, table: CanonicalTable):
+        """Append a table, keeping the name index in sync."""
+        self._table_index.add(self.tables, table)
+    
+    def invalidate_index(self):
+        """Drop the name index after replacing or renaming tables in place."""
+        self._table_index.invalidate()
 
 
-@dataclass
+@dataclass(slots=True)
 class VisualEncoding:
     """Encoding for a visual channel."""
     field_name: str
@@ -156,7 +175,7 @@ class VisualEncoding:
     format_string: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalVisual:
     """A platform-agnostic visual definition."""
     id: str
@@ -183,7 +202,7 @@ class CanonicalVisual:
     unsupported_features: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalFilter:
     """A platform-agnostic filter definition."""
     field_name: str
@@ -194,7 +213,7 @@ class CanonicalFilter:
     is_slicer: bool = False
 
 
-@dataclass 
+@dataclass(slots=True)
 class CanonicalPage:
     """A platform-agnostic page/dashboard definition."""
     id: str
@@ -207,7 +226,7 @@ class CanonicalPage:
     source_dashboard: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CanonicalReport:
     """A complete platform-agnostic report definition."""
     name: str
@@ -220,9 +239,14 @@ class CanonicalReport:
     source_file: Optional[str] = None
     migration_warnings: List[str] = field(default_factory=list)
     unsupported_features: Dict[str, List[str]] = field(default_factory=dict)
+    
+    @property
+    def visual_count(self) -> int:
+        """Total visuals across all pages."""
+        return sum(len(page.visuals) for page in self.pages)
 
 
-@dataclass
+@dataclass(slots=True)
 class MigrationReport:
     """Summary of the migration process."""
     source_file: str
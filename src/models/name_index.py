@@ -0,0 +1,61 @@
+"""
+Name Index
+
+Lazily built name -> item lookup shared by the schema models.
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+class NameIndex:
+    """
+    First-wins lookup over a list of named items, built on first use.
+
+    The index remembers which list it was built from and how long it was,
+    and rebuilds when either changes, so items appended to the list directly
+    (or a newly assigned list) are still found. Replacing or renaming items
+    in place needs invalidate().
+    """
+
+    __slots__ = ('_key_attrs', '_items', '_size', '_index')
+
+    def __init__(self, *key_attrs: str):
+        # Attributes to index each item under, in priority order
+        self._key_attrs = key_attrs or ('name',)
+        self._items: Optional[List[Any]] = None
+        self._size = -1
+        self._index: Dict[Any, Any] = {}
+
+    def get(self, items: List[Any], name: Any) -> Optional[Any]:
+        """Return the first item in ``items`` matching ``name``, or None."""
+        if not self._is_current(items):
+            self._rebuild(items)
+        return self._index.get(name)
+
+    def add(self, items: List[Any], item: Any):
+        """Append ``item`` to ``items``, updating the index if it is current."""
+        current = self._is_current(items)
+        items.append(item)
+        if current:
+            self._insert(item)
+            self._size += 1
+
+    def invalidate(self):
+        """Force a rebuild on the next lookup."""
+        self._size = -1
+
+    def _is_current(self, items: List[Any]) -> bool:
+        return self._items is items and self._size == len(items)
+
+    def _rebuild(self, items: List[Any]):
+        self._index = {}
+        for item in items:
+            self._insert(item)
+        self._items = items
+        self._size = len(items)
+
+    def _insert(self, item: Any):
+        setdefault = self._index.setdefault
+        for attr in self._key_attrs:
+            # Earlier items win, matching a linear scan
+            setdefault(getattr(item, attr), item)
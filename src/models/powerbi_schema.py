@@ -4,11 +4,41 @@ Power BI Schema Models
 Defines structures for generating Power BI PBIP artifacts.
 """
 
+import hashlib
+import functools
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 
+from .name_index import NameIndex
 
-@dataclass
+
+# Pre-initialized hasher; copy() is cheaper than building a new MD5 context per id
+_MD5_BASE = hashlib.md5()
+
+
+def _md5_hex(text: str) -> str:
+    """Return the MD5 hex digest of a string using the shared base hasher."""
+    h = _MD5_BASE.copy()
+    h.update(text.encode())
+    return h.hexdigest()
+
+
+# One entry per table, column and measure name; bounded so long batch runs
+# don't keep every name ever seen
+@functools.lru_cache(maxsize=4096)
+def _lineage_tag_for(name: str) -> str:
+    """Format the MD5 of a name as a deterministic GUID-style lineage tag."""
+    h = _md5_hex(name)
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:32]}"
+
+
+@functools.lru_cache(maxsize=1024)
+def _relationship_id_for(key: str) -> str:
+    """Derive a deterministic 16-character relationship id from its key."""
+    return _md5_hex(key)[:16]
+
+
+@dataclass(slots=True, frozen=True)
 class PBIColumn:
     """Power BI semantic model column."""
     name: str
@@ -21,21 +51,27 @@ class PBIColumn:
     
     def to_tmdl(self) -> str:
         """Generate TMDL representation."""
-        lines = [f'\tcolumn {self.name}']
-        lines.append(f'\t\tdataType: {self.data_type}')
+        lines: List[str] = []
+        self.write_tmdl(lines)
+        return '\n'.join(lines)
+    
+    def write_tmdl(self, out: List[str]):
+        """Append TMDL lines to a shared buffer."""
+        append = out.append
+        append(f'\tcolumn {self.name}')
+        append(f'\t\tdataType: {self.data_type}')
         if self.source_column:
-            lines.append(f'\t\tsourceColumn: {self.source_column}')
+            append(f'\t\tsourceColumn: {self.source_column}')
         if self.format_string:
-            lines.append(f'\t\tformatString: {self.format_string}')
+            append(f'\t\tformatString: {self.format_string}')
         if self.is_hidden:
-            lines.append('\t\tisHidden')
+            append('\t\tisHidden')
         if self.summarize_by != "None":
-            lines.append(f'\t\tsummarizeBy: {self.summarize_by}')
-        lines.append('')
-        return '\n'.join(lines)
+            append(f'\t\tsummarizeBy: {self.summarize_by}')
+        append('')
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PBIMeasure:
     """Power BI semantic model measure."""
     name: str
@@ -47,18 +83,24 @@ class PBIMeasure:
     
     def to_tmdl(self) -> str:
         """Generate TMDL representation."""
-        lines = [f'\tmeasure {self.name} = {self.expression}']
+        lines: List[str] = []
+        self.write_tmdl(lines)
+        return '\n'.join(lines)
+    
+    def write_tmdl(self, out: List[str]):
+        """Append TMDL lines to a shared buffer."""
+        append = out.append
+        append(f'\tmeasure {self.name} = {self.expression}')
         if self.format_string:
-            lines.append(f'\t\tformatString: {self.format_string}')
+            append(f'\t\tformatString: {self.format_string}')
         if self.is_hidden:
-            lines.append('\t\tisHidden')
+            append('\t\tisHidden')
         if self.display_folder:
-            lines.append(f'\t\tdisplayFolder: {self.display_folder}')
-        lines.append('')
-        return '\n'.join(lines)
+            append(f'\t\tdisplayFolder: {self.display_folder}')
+        append('')
 
 
-@dataclass
+@dataclass(slots=True)
 class PBITable:
     """Power BI semantic model table."""
     name: str
@@ -69,31 +111,31 @@ class PBITable:
     
     def to_tmdl(self) -> str:
         """Generate TMDL representation."""
-        lines = [f'table {self.name}']
-        lines.append('\tlineageTag: ' + self._generate_lineage_tag())
-        lines.append('')
+        lines: List[str] = []
+        self.write_tmdl(lines)
+        return '\n'.join(lines)
+    
+    def write_tmdl(self, out: List[str]):
+        """Append TMDL lines, including columns and measures, to a shared buffer."""
+        append = out.append
+        append(f'table {self.name}')
+        append('\tlineageTag: ' + self._generate_lineage_tag())
+        append('')
         
         # Add columns
         for col in self.columns:
-            lines.append(col.to_tmdl())
+            col.write_tmdl(out)
         
         # Add measures
         for measure in self.measures:
-            lines.append(measure.to_tmdl())
-        
-        return '\n'.join(lines)
+            measure.write_tmdl(out)
     
     def _generate_lineage_tag(self) -> str:
         """Generate a deterministic lineage tag."""
-        import hashlib
-        return hashlib.md5(self.name.encode()).hexdigest()[:8] + '-' + \
-               hashlib.md5(self.name.encode()).hexdigest()[8:12] + '-' + \
-               hashlib.md5(self.name.encode()).hexdigest()[12:16] + '-' + \
-               hashlib.md5(self.name.encode()).hexdigest()[16:20] + '-' + \
-               hashlib.md5(self.name.encode()).hexdigest()[20:32]
+        return _lineage_tag_for(self.name)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PBIRelationship:
     """Power BI semantic model relationship."""
     from_table: str
@@ -105,24 +147,34 @@ class PBIRelationship:
     
     def to_tmdl(self) -> str:
         """Generate TMDL representation."""
-        lines = [f'relationship {self._generate_id()}']
-        lines.append(f'\tfromColumn: {self.from_table}[{self.from_column}]')
-        lines.append(f'\ttoColumn: {self.to_table}[{self.to_column}]')
+        lines: List[str] = []
+        self.write_tmdl(lines)
+        return '\n'.join(lines)
+    
+    def write_tmdl(self, out: List[str]):
+        """Append TMDL lines to a shared buffer."""
+        append = out.append
+        append(f'relationship {self._generate_id()}')
+        append(f'\tfromColumn: {self.from_table}[{self.from_column}]')
+        append(f'\ttoColumn: {self.to_table}[{self.to_column}]')
         if not self.is_active:
-            lines.append('\tisActive: false')
+            append('\tisActive: false')
         if self.cross_filtering != "oneDirection":
-            lines.append(f'\tcrossFilteringBehavior: {self.cross_filtering}')
-        lines.append('')
-        return '\n'.join(lines)
+            append(f'\tcrossFilteringBehavior: {self.cross_filtering}')
+        append('')
     
     def _generate_id(self) -> str:
-        import hashlib
         key = f"{self.from_table}.{self.from_column}->{self.to_table}.{self.to_column}"
-        return hashlib.md5(key.encode()).hexdigest()[:16]
+        return _relationship_id_for(key)
+
+
+class _TableIndexSlot:
+    """Holds the table name index outside the dataclass fields."""
+    __slots__ = ('_table_index',)
 
 
-@dataclass
-class PBISemanticModel:
+@dataclass(slots=True)
+class PBISemanticModel(_TableIndexSlot):
     """Power BI semantic model."""
     name: str
     tables: List[PBITable] = field(default_factory=list)
@@ -130,14 +182,24 @@ class PBISemanticModel:
     culture: str = "en-US"
     compatibility_level: int = 1600
     
+    def __post_init__(self):
+        # Lazily built name -> table index (see get_table_by_name); a plain
+        # slot, so fields(), asdict(), repr and == don't see it
+        self._table_index = NameIndex()
+    
     def get_table_by_name(self, name: str) -> Optional[PBITable]:
-        for table in self.tables:
-            if table.name == name:
-                return table
-        return None
+        return self._table_index.get(self.tables, name)
+    
+    def add_table(self, table: PBITable):
+        """Append a table, keeping the name index in sync."""
+        self._table_index.add(self.tables, table)
+    
+    def invalidate_index(self):
+        """Drop the name index after replacing or renaming tables in place."""
+        self._table_index.invalidate()
 
 
-@dataclass
+@dataclass(slots=True)
 class PBIVisualConfig:
     """Configuration for a Power BI visual."""
     visual_type: str
@@ -151,7 +213,7 @@ class PBIVisualConfig:
     properties: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class PBIPage:
     """Power BI report page."""
     name: str
@@ -162,7 +224,7 @@ class PBIPage:
     display_option: str = "FitToPage"
 
 
-@dataclass
+@dataclass(slots=True)
 class PBIReport:
     """Power BI report definition."""
     name: str
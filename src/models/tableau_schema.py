@@ -2,14 +2,18 @@
 Tableau Semantic Schema Models
 
 Defines the data structures for extracted Tableau workbook metadata.
+
+Enums are str-valued so members serialize to JSON as their value directly.
 """
 
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Any
 from enum import Enum
 
+from .name_index import NameIndex
+
 
-class TableauVisualType(Enum):
+class TableauVisualType(str, Enum):
     """Tableau worksheet/visualization types."""
     BAR = "bar"
     LINE = "line"
@@ -30,7 +34,7 @@ class TableauVisualType(Enum):
     UNKNOWN = "unknown"
 
 
-class TableauDataType(Enum):
+class TableauDataType(str, Enum):
     """Tableau field data types."""
     STRING = "string"
     INTEGER = "integer"
@@ -41,13 +45,13 @@ class TableauDataType(Enum):
     UNKNOWN = "unknown"
 
 
-class TableauRole(Enum):
+class TableauRole(str, Enum):
     """Tableau field role (dimension vs measure)."""
     DIMENSION = "dimension"
     MEASURE = "measure"
 
 
-class CalculationType(Enum):
+class CalculationType(str, Enum):
     """Types of Tableau calculations."""
     BASIC = "basic"  # Simple aggregations
     TABLE_CALC = "table_calculation"  # Table calculations (unsupported)
@@ -55,7 +59,7 @@ class CalculationType(Enum):
     PARAMETER = "parameter"
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauColumn:
     """Represents a column/field in Tableau."""
     name: str
@@ -73,7 +77,7 @@ class TableauColumn:
         return self.caption or self.name
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauTable:
     """Represents a logical table in Tableau."""
     name: str
@@ -87,7 +91,7 @@ class TableauTable:
         return self.caption or self.name
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauDatasource:
     """Represents a Tableau datasource."""
     name: str
@@ -102,7 +106,7 @@ class TableauDatasource:
         return self.caption or self.name
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TableauFilter:
     """Represents a filter in Tableau."""
     field_name: str
@@ -112,14 +116,14 @@ class TableauFilter:
     is_global: bool = False
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TableauShelf:
     """Represents a shelf (rows, columns, color, etc.) in a worksheet."""
     shelf_type: str  # rows, columns, pages, filters, color, size, label, detail, tooltip
     fields: List[Dict[str, Any]] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauWorksheet:
     """Represents a Tableau worksheet."""
     name: str
@@ -137,7 +141,7 @@ class TableauWorksheet:
     marks: Dict[str, List[str]] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauDashboardZone:
     """Represents a zone (visual container) in a dashboard."""
     zone_id: str
@@ -149,7 +153,7 @@ class TableauDashboardZone:
     height: int = 100
 
 
-@dataclass
+@dataclass(slots=True)
 class TableauDashboard:
     """Represents a Tableau dashboard."""
     name: str
@@ -159,8 +163,13 @@ class TableauDashboard:
     title: Optional[str] = None
 
 
-@dataclass
-class TableauWorkbook:
+class _WorkbookIndexSlots:
+    """Holds the workbook lookup indexes outside the dataclass fields."""
+    __slots__ = ('_datasource_index', '_worksheet_index')
+
+
+@dataclass(slots=True)
+class TableauWorkbook(_WorkbookIndexSlots):
     """Represents a complete Tableau workbook."""
     name: str
     datasources: List[TableauDatasource] = field(default_factory=list)
@@ -169,14 +178,20 @@ class TableauWorkbook:
     parameters: List[Dict[str, Any]] = field(default_factory=list)
     version: Optional[str] = None
     
+    def __post_init__(self):
+        # Lazily built lookup indexes (see get_*_by_name) in plain slots, so
+        # fields(), asdict(), repr and == don't see them; datasources match
+        # on name or caption
+        self._datasource_index = NameIndex('name', 'caption')
+        self._worksheet_index = NameIndex()
+    
     def get_datasource_by_name(self, name: str) -> Optional[TableauDatasource]:
-        for ds in self.datasources:
-            if ds.name == name or ds.caption == name:
-                return ds
-        return None
+        return self._datasource_index.get(self.datasources, name)
     
     def get_worksheet_by_name(self, name: str) -> Optional[TableauWorksheet]:
-        for ws in self.worksheets:
-            if ws.name == name:
-                return ws
-        return None
+        return self._worksheet_index.get(self.worksheets, name)
+    
+    def invalidate_index(self):
+        """Drop lookup indexes after replacing or renaming items in place."""
+        self._datasource_index.invalidate()
+        self._worksheet_index.invalidate()
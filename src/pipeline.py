@@ -11,12 +11,22 @@ Stages:
 """
 
 import os
+import re
+import sys
 import json
 import shutil
+import hashlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; fall back to the stdlib encoder
+    orjson = None
+
 from .extractors.tableau_extractor import TableauExtractor
 from .transformers.canonical_transformer import CanonicalTransformer
 from .generators.powerbi_report_generator import PBIPProjectGenerator
@@ -24,6 +34,16 @@ from .models.canonical_schema import (
     CanonicalReport, MigrationReport, ConfidenceLevel
 )
 
+# Larger chunks for the template resource copies done by the generators (the
+# default is 64 KiB, 1 MiB on Windows; Linux copies use sendfile regardless)
+shutil.COPY_BUFSIZE = 8 * 1024 * 1024
+
+# Confidence levels counted as successfully translated measures
+_TRANSLATED_CONFIDENCE = frozenset({ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM})
+
+# Characters dropped from project names; \w matches exactly str.isalnum() plus '_'
+_PROJECT_NAME_STRIP = re.compile(r'[^\w-]')
+
 
 @dataclass
 class PipelineConfig:
@@ -33,6 +53,12 @@ class PipelineConfig:
     template_path: Optional[str] = None  # Optional PBIP template
     save_intermediate: bool = True  # Save intermediate JSON files
     verbose: bool = True  # Enable verbose logging
+    max_workers: Optional[int] = 1  # Worker processes for multi-file runs (1 = serial, None = CPU count)
+    blake2b_page_ids: bool = False  # BLAKE2b page IDs (changes IDs of existing projects)
+    
+    def __post_init__(self):
+        if self.max_workers is not None and self.max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1 (or None), got {self.max_workers}")
 
 
 class MigrationPipeline:
@@ -45,6 +71,9 @@ class MigrationPipeline:
     def __init__(self, config: PipelineConfig):
         self.config = config
         self.migration_reports: List[MigrationReport] = []
+        self._log_buf: List[str] = []
+        # Stateless between workbooks (transform() resets its tracking), so share one
+        self._transformer = CanonicalTransformer(blake2b_page_ids=config.blake2b_page_ids)
     
     def run(self) -> List[MigrationReport]:
         """
@@ -62,16 +91,45 @@ class MigrationPipeline:
         
         print(f"Found {len(twbx_files)} Tableau workbook(s) to migrate")
         
-        # Process each file
-        for twbx_file in twbx_files:
-            report = self._process_file(twbx_file)
-            self.migration_reports.append(report)
+        # Process each file; files are independent, so with max_workers != 1
+        # they are spread across worker processes (reports keep input order)
+        if len(twbx_files) > 1 and self.config.max_workers != 1:
+            with ProcessPoolExecutor(max_workers=self.config.max_workers) as executor:
+                futures = [
+                    executor.submit(_process_file_worker, twbx_file, self.config)
+                    for twbx_file in twbx_files
+                ]
+                for twbx_file, future in zip(twbx_files, futures):
+                    self.migration_reports.append(self._collect_worker_report(twbx_file, future))
+        else:
+            for twbx_file in twbx_files:
+                report = self._process_file(twbx_file)
+                self.migration_reports.append(report)
         
         # Generate summary report
         self._generate_summary_report()
         
         return self.migration_reports
     
+    def _collect_worker_report(self, twbx_file: str, future) -> MigrationReport:
+        """Wait for a worker's report, turning a crashed worker into a failed report."""
+        try:
+            return future.result()
+        except Exception as e:
+            # _process_file catches migration errors itself; this is the worker
+            # dying (BrokenProcessPool, which also fails every file still
+            # pending in the pool) or its result failing to unpickle
+            file_name = os.path.splitext(os.path.basename(twbx_file))[0]
+            print(f"\n✗ Migration worker failed for {file_name}: {e!r}")
+            return MigrationReport(
+                source_file=twbx_file,
+                output_folder=os.path.join(
+                    self.config.output_path, self._sanitize_project_name(file_name)
+                ),
+                success=False,
+                error_message=f"Worker process failed: {e!r}"
+            )
+    
     def _find_twbx_files(self) -> List[str]:
         """Find all TWBX files in the input path."""
         if os.path.isfile(self.config.input_path):
@@ -79,13 +137,7 @@ class MigrationPipeline:
                 return [self.config.input_path]
             return []
         
-        twbx_files = []
-        for root, dirs, files in os.walk(self.config.input_path):
-            for file in files:
-                if file.endswith(('.twbx', '.twb')):
-                    twbx_files.append(os.path.join(root, file))
-        
-        return twbx_files
+        return list(_iter_twbx_files(self.config.input_path))
     
     def _process_file(self, twbx_file: str) -> MigrationReport:
         """Process a single Tableau workbook file."""
@@ -113,18 +165,21 @@ class MigrationPipeline:
             
             # Stage 2: Generate Canonical Schema
             self._log("\nStage 2: Generating canonical BI schema...")
-            transformer = CanonicalTransformer()
+            transformer = self._transformer
             canonical_report = transformer.transform(tableau_workbook)
             
             self._log(f"  - Created {len(canonical_report.dataset.tables)} table(s)")
             self._log(f"  - Created {len(canonical_report.pages)} page(s)")
             
+            # Serialize each measure once for the intermediate JSON and the report
+            measure_dicts = self._measure_dicts(canonical_report)
+            
             # Save intermediate if requested
             if self.config.save_intermediate:
-                self._save_canonical_schema(canonical_report, project_name)
+                self._save_canonical_schema(canonical_report, project_name, measure_dicts)
             
             # Track measures
-            self._track_measures(canonical_report, migration_report)
+            self._track_measures(canonical_report, migration_report, measure_dicts)
             
             # Track unsupported features
             migration_report.unsupported_features = [
@@ -144,9 +199,7 @@ class MigrationPipeline:
             # Update migration report counts
             migration_report.dashboards_migrated = len(canonical_report.pages)
             migration_report.worksheets_migrated = len(tableau_workbook.worksheets)
-            migration_report.visuals_migrated = sum(
-                len(page.visuals) for page in canonical_report.pages
-            )
+            migration_report.visuals_migrated = canonical_report.visual_count
             migration_report.tables_created = len(canonical_report.dataset.tables)
             migration_report.success = True
             
@@ -160,41 +213,72 @@ class MigrationPipeline:
             migration_report.success = False
             migration_report.error_message = str(e)
             self._log(f"\n✗ Migration failed: {e}")
-            import traceback
+            self._flush_log()
             traceback.print_exc()
         
+        self._flush_log()
         return migration_report
     
-    def _track_measures(self, report: CanonicalReport, migration_report: MigrationReport):
+    def _measure_dicts(self, report: CanonicalReport) -> List[List[Dict[str, Any]]]:
+        """Serialize the measures of each table, in table order."""
+        return [[m.to_dict() for m in table.measures] for table in report.dataset.tables]
+    
+    def _track_measures(self, report: CanonicalReport, migration_report: MigrationReport,
+                        measure_dicts: Optional[List[List[Dict[str, Any]]]] = None):
         """Track translated and flagged measures."""
-        for table in report.dataset.tables:
-            for measure in table.measures:
-                measure_info = measure.to_dict()
-                
-                if measure.confidence in [ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM]:
-                    migration_report.translated_measures.append(measure_info)
-                    migration_report.measures_translated += 1
+        if measure_dicts is None:
+            measure_dicts = self._measure_dicts(report)
+        
+        translated = []
+        flagged = []
+        for table, dicts in zip(report.dataset.tables, measure_dicts):
+            for measure, measure_dict in zip(table.measures, dicts):
+                if measure.confidence in _TRANSLATED_CONFIDENCE:
+                    translated.append(measure_dict)
                 else:
-                    migration_report.flagged_measures.append(measure_info)
-                    migration_report.measures_flagged += 1
+                    flagged.append(measure_dict)
+        
+        migration_report.translated_measures.extend(translated)
+        migration_report.measures_translated += len(translated)
+        migration_report.flagged_measures.extend(flagged)
+        migration_report.measures_flagged += len(flagged)
     
-    def _save_canonical_schema(self, report: CanonicalReport, project_name: str):
+    def _save_canonical_schema(self, report: CanonicalReport, project_name: str,
+                               measure_dicts: Optional[List[List[Dict[str, Any]]]] = None):
         """Save the canonical schema as intermediate JSON."""
-        intermediate_path = os.path.join(
-            self.config.output_path, 'intermediate', f'{project_name}_canonical.json'
-        )
-        os.makedirs(os.path.dirname(intermediate_path), exist_ok=True)
+        intermediate_dir = os.path.join(self.config.output_path, 'intermediate')
+        os.makedirs(intermediate_dir, exist_ok=True)
+        intermediate_path = os.path.join(intermediate_dir, f'{project_name}_canonical.json')
         
         # Convert to serializable format
-        schema = self._serialize_canonical_report(report)
+        schema = self._serialize_canonical_report(report, measure_dicts)
         
-        with open(intermediate_path, 'w', encoding='utf-8') as f:
-            json.dump(schema, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(schema, option=orjson.OPT_INDENT_2)
+        else:
+            # Non-ASCII written as UTF-8, like orjson, so both paths give the same bytes
+            data = json.dumps(schema, indent=2, ensure_ascii=False).encode('utf-8')
+        
+        # Skip the write when the file on disk already holds this content
+        digest = hashlib.blake2b(data, digest_size=8).hexdigest()
+        digest_path = intermediate_path + '.sha'
+        if _is_up_to_date(intermediate_path, digest_path, digest):
+            self._log(f"  - Canonical schema unchanged: {intermediate_path}")
+            return
+        
+        with open(intermediate_path, 'wb') as f:
+            f.write(data)
+        with open(digest_path, 'w', encoding='utf-8') as f:
+            f.write(digest)
         
         self._log(f"  - Saved canonical schema to: {intermediate_path}")
     
-    def _serialize_canonical_report(self, report: CanonicalReport) -> dict:
+    def _serialize_canonical_report(self, report: CanonicalReport,
+                                    measure_dicts: Optional[List[List[Dict[str, Any]]]] = None) -> dict:
         """Serialize canonical report to dictionary."""
+        if measure_dicts is None:
+            measure_dicts = self._measure_dicts(report)
+        
         return {
             "name": report.name,
             "source_file": report.source_file,
@@ -208,13 +292,13 @@ class MigrationPipeline:
                             {
                                 "name": col.name,
                                 "display_name": col.display_name,
-                                "data_type": col.data_type.value
+                                "data_type": col.data_type
                             }
                             for col in table.columns
                         ],
-                        "measures": [m.to_dict() for m in table.measures]
+                        "measures": dicts
                     }
-                    for table in report.dataset.tables
+                    for table, dicts in zip(report.dataset.tables, measure_dicts)
                 ]
             },
             "pages": [
@@ -228,12 +312,12 @@ class MigrationPipeline:
                         {
                             "id": visual.id,
                             "name": visual.name,
-                            "type": visual.visual_type.value,
+                            "type": visual.visual_type,
                             "x": visual.x,
                             "y": visual.y,
                             "width": visual.width,
                             "height": visual.height,
-                            "confidence": visual.confidence.value,
+                            "confidence": visual.confidence,
                             "unsupported_features": visual.unsupported_features
                         }
                         for visual in page.visuals
@@ -247,17 +331,25 @@ class MigrationPipeline:
     
     def _generate_summary_report(self):
         """Generate a summary report of all migrations."""
+        successful = sum(r.success for r in self.migration_reports)
         summary = {
             "generated_at": datetime.now().isoformat(),
             "total_files": len(self.migration_reports),
-            "successful": sum(1 for r in self.migration_reports if r.success),
-            "failed": sum(1 for r in self.migration_reports if not r.success),
+            "successful": successful,
+            "failed": len(self.migration_reports) - successful,
             "migrations": [r.to_dict() for r in self.migration_reports]
         }
         
+        # May not exist yet if every file failed before writing output
+        os.makedirs(self.config.output_path, exist_ok=True)
         summary_path = os.path.join(self.config.output_path, 'migration_report.json')
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(summary, option=orjson.OPT_INDENT_2)
+        else:
+            # Same bytes as orjson: UTF-8 rather than \u escapes, no newline translation
+            data = json.dumps(summary, indent=2, ensure_ascii=False).encode('utf-8')
+        with open(summary_path, 'wb') as f:
+            f.write(data)
         
         self._log(f"\n{'='*60}")
         self._log("MIGRATION SUMMARY")
@@ -266,18 +358,74 @@ class MigrationPipeline:
         self._log(f"Successful: {summary['successful']}")
         self._log(f"Failed: {summary['failed']}")
         self._log(f"\nReport saved to: {summary_path}")
+        self._flush_log()
     
     def _sanitize_project_name(self, name: str) -> str:
         """Sanitize the project name for use in folder/file names."""
         # Replace spaces and special characters
-        sanitized = name.replace(' ', '_')
-        sanitized = ''.join(c for c in sanitized if c.isalnum() or c in '_-')
+        sanitized = _PROJECT_NAME_STRIP.sub('', name.replace(' ', '_'))
         return sanitized or 'MigratedProject'
     
     def _log(self, message: str):
-        """Log a message if verbose mode is enabled."""
+        """Buffer a log message if verbose mode is enabled (see _flush_log)."""
         if self.config.verbose:
-            print(message)
+            self._log_buf.append(message)
+    
+    def _flush_log(self):
+        """Write buffered log messages to stdout in a single write."""
+        if self._log_buf:
+            sys.stdout.write('\n'.join(self._log_buf) + '\n')
+            sys.stdout.flush()
+            self._log_buf.clear()
+
+
+def _iter_twbx_files(root: str):
+    """
+    Yield Tableau workbook paths under root, in the same order as os.walk.
+    
+    Uses os.scandir so directory entries are classified from d_type
+    without an extra stat per file.
+    """
+    subdirs = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, do not descend into symlinked directories
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                elif entry.name.endswith(('.twbx', '.twb')):
+                    yield entry.path
+    except OSError:
+        return
+    
+    for subdir in subdirs:
+        yield from _iter_twbx_files(subdir)
+
+
+def _is_up_to_date(path: str, digest_path: str, digest: str) -> bool:
+    """
+    Check whether path was last written with content matching digest.
+    
+    The sidecar digest file is written after the data file, so a data
+    file modified later than its sidecar is treated as stale.
+    """
+    try:
+        if os.path.getmtime(path) > os.path.getmtime(digest_path):
+            return False
+        with open(digest_path, 'r', encoding='utf-8') as f:
+            return f.read().strip() == digest
+    except OSError:
+        return False
+
+
+def _process_file_worker(twbx_file: str, config: PipelineConfig) -> MigrationReport:
+    """Process a single file in a worker process (module-level so it pickles)."""
+    return MigrationPipeline(config)._process_file(twbx_file)
 
 
 def migrate(
@@ -285,7 +433,9 @@ def migrate(
     output_path: str,
     template_path: Optional[str] = None,
     save_intermediate: bool = True,
-    verbose: bool = True
+    verbose: bool = True,
+    max_workers: Optional[int] = 1,
+    blake2b_page_ids: bool = False
 ) -> List[MigrationReport]:
     """
     Convenience function to run the migration pipeline.
@@ -296,6 +446,12 @@ def migrate(
         template_path: Optional path to a template PBIP folder for resources
         save_intermediate: Whether to save intermediate canonical JSON
         verbose: Whether to print progress messages
+        max_workers: Worker processes for multi-file runs (1 = serial, None = CPU count).
+            Values other than 1 use multiprocessing, so on spawn platforms
+            (Windows, macOS) the calling script needs an
+            ``if __name__ == '__main__':`` guard
+        blake2b_page_ids: Derive page IDs from BLAKE2b instead of MD5 (IDs differ
+            from projects generated without it)
         
     Returns:
         List of MigrationReport objects
@@ -305,7 +461,9 @@ def migrate(
         output_path=output_path,
         template_path=template_path,
         save_intermediate=save_intermediate,
-        verbose=verbose
+        verbose=verbose,
+        max_workers=max_workers,
+        blake2b_page_ids=blake2b_page_ids
     )
     
     pipeline = MigrationPipeline(config)
@@ -6,10 +6,39 @@ Includes confidence scoring and unsupported feature flagging.
 """
 
 import re
-from typing import Tuple, Optional, List
+import sys
+import functools
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Optional, List, Sequence
 from ..models.canonical_schema import ConfidenceLevel, AggregationType
 
 
+# Ordering used to combine per-stage confidences (lower is worse)
+_CONFIDENCE_RANK = {
+    ConfidenceLevel.UNSUPPORTED: 0,
+    ConfidenceLevel.LOW: 1,
+    ConfidenceLevel.MEDIUM: 2,
+    ConfidenceLevel.HIGH: 3,
+}
+
+
+def _first_char_guard(names) -> str:
+    """Build a lookahead on the names' first characters so sre can skip other positions fast."""
+    return '(?=[' + ''.join(sorted({re.escape(name[0]) for name in names})) + '])'
+
+
+# Below this many distinct formulas, process start-up costs more than it saves
+_PARALLEL_MIN_FORMULAS = 10000
+
+
+def _lastindex_replacer(targets: List[Optional[str]]):
+    """Build a re.sub callback returning the target for whichever group matched."""
+    def replace(match):
+        return targets[match.lastindex]
+    return replace
+
+
 class CalculationTranslator:
     """
     Translates Tableau calculations to DAX expressions.
@@ -140,8 +169,53 @@ class CalculationTranslator:
         'SCRIPT_STR': 'R/Python Integration',
     }
     
+    # Precompiled patterns, built once at class load instead of per formula
+    _LOD_PATTERN = re.compile(r'\{\s*(FIXED|INCLUDE|EXCLUDE)', re.IGNORECASE)
+    _UNSUPPORTED_PATTERN = re.compile(
+        _first_char_guard(UNSUPPORTED_FUNCTIONS) + r'\b(' + '|'.join(UNSUPPORTED_FUNCTIONS) + r')\s*\('
+    )
+    _UNSUPPORTED_PRIORITY = {func: i for i, func in enumerate(UNSUPPORTED_FUNCTIONS)}
+    _FIELD_PATTERN = re.compile(r'(?<!\w)\[([^\]]+)\]')
+    # AGG( inner ) -> DAX(inner): the lookahead keeps the old one-character
+    # minimum and the \s* around the lazy group does the strip(), so the
+    # rewrite is a backreference template with no Python callback
+    _AGG_PATTERNS = [
+        (re.compile(rf'\b{tableau_agg}\s*\((?=[^)])\s*([^)]*?)\s*\)', re.IGNORECASE), rf'{dax_agg}(\1)')
+        for tableau_agg, (dax_agg, _) in AGGREGATION_MAP.items()
+    ]
+    # Which aggregations are called at all (group i+1 is AGGREGATION_MAP entry i)
+    _AGG_CALL_PATTERN = re.compile(
+        _first_char_guard(AGGREGATION_MAP) + r'\b(?:' + '|'.join(f'({agg})' for agg in AGGREGATION_MAP) + r')\s*\(',
+        re.IGNORECASE
+    )
+    _AGG_TYPE_PATTERN = re.compile(
+        _first_char_guard(AGGREGATION_MAP) + r'\b(' + '|'.join(AGGREGATION_MAP) + r')\s*\('
+    )
+    _AGG_PRIORITY = {agg_name: i for i, agg_name in enumerate(AGGREGATION_MAP)}
+    # One capture group per mapped function; m.lastindex selects the DAX name
+    _FUNC_RENAME_PATTERN = re.compile(
+        _first_char_guard(func for func, dax in FUNCTION_MAP.items() if dax) + r'\b(?:' + '|'.join(f'({func})' for func, dax in FUNCTION_MAP.items() if dax) + r')\s*\(',
+        re.IGNORECASE
+    )
+    _FUNC_RENAME_REPL = staticmethod(
+        _lastindex_replacer([None] + [f'{dax}(' for dax in FUNCTION_MAP.values() if dax])
+    )
+    _FUNC_UNMAPPED_PATTERN = re.compile(
+        _first_char_guard(func for func, dax in FUNCTION_MAP.items() if dax is None) + r'\b(?:' + '|'.join(func for func, dax in FUNCTION_MAP.items() if dax is None) + r')\s*\(',
+        re.IGNORECASE
+    )
+    _ZN_PATTERN = re.compile(r'ZN\s*\(([^)]+)\)', re.IGNORECASE)
+    _IFNULL_PATTERN = re.compile(r'IFNULL\s*\(([^,]+),\s*([^)]+)\)', re.IGNORECASE)
+    _CASE_PATTERN = re.compile(r'\bCASE\b', re.IGNORECASE)
+    
+    __slots__ = ('table_name', '_warnings', '_field_template')
+    
     def __init__(self, table_name: str = "Data"):
-        self.table_name = table_name
+        # Interned: the same table name is shared by every translator for a datasource
+        self.table_name = sys.intern(table_name)
+        # re.sub template for 'Table'[Field], with the table name baked in
+        # (backslashes escaped so only \1 is expanded)
+        self._field_template = "'" + table_name.replace('\\', '\\\\') + "'[\\1]"
         self._warnings: List[str] = []
     
     def translate(self, tableau_formula: str) -> Tuple[Optional[str], ConfidenceLevel, Optional[str]]:
@@ -155,7 +229,51 @@ class CalculationTranslator:
             Tuple of (dax_expression, confidence, unsupported_reason)
         """
         self._warnings = []
+        return self._translate_cached(tableau_formula, self.table_name)
+    
+    @classmethod
+    def translate_many(cls, formulas: Sequence[str], table_name: str = "Data",
+                       workers: Optional[int] = None) -> List[Tuple[Optional[str], ConfidenceLevel, Optional[str]]]:
+        """
+        Translate a batch of formulas, spreading large batches across processes.
         
+        Args:
+            formulas: Tableau formulas to translate
+            table_name: Table used to qualify field references
+            workers: Worker processes (1 = translate in this process). None picks
+                the CPU count, but batches under _PARALLEL_MIN_FORMULAS distinct
+                formulas are then translated in this process, where start-up
+                would outweigh the gain. An explicit count is always honoured.
+            
+        Returns:
+            List of (dax_expression, confidence, unsupported_reason), in input order
+        """
+        unique = list(dict.fromkeys(formulas))
+        
+        if workers is None and len(unique) < _PARALLEL_MIN_FORMULAS:
+            workers = 1
+        
+        if workers == 1:
+            translator = cls(table_name)
+            results = [translator.translate(f) for f in unique]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    _translate_one, itertools.repeat(cls), itertools.repeat(table_name),
+                    unique, chunksize=64
+                ))
+        
+        by_formula = dict(zip(unique, results))
+        return [by_formula[f] for f in formulas]
+    
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _translate_cached(cls, tableau_formula: str, table_name: str) -> Tuple[Optional[str], ConfidenceLevel, Optional[str]]:
+        """Translate with a fresh instance (memoized; depends only on formula and table name)."""
+        return cls(table_name)._translate_uncached(tableau_formula)
+    
+    def _translate_uncached(self, tableau_formula: str) -> Tuple[Optional[str], ConfidenceLevel, Optional[str]]:
+        """Translate a formula without consulting the cache."""
         if not tableau_formula:
             return None, ConfidenceLevel.HIGH, None
         
@@ -175,59 +293,62 @@ class CalculationTranslator:
     
     def _check_unsupported(self, formula: str) -> Optional[str]:
         """Check for unsupported Tableau constructs."""
-        formula_upper = formula.upper()
-        
         # Check for LOD expressions (curly braces syntax)
         if '{' in formula and '}' in formula:
-            lod_match = re.search(r'\{\s*(FIXED|INCLUDE|EXCLUDE)', formula, re.IGNORECASE)
+            lod_match = self._LOD_PATTERN.search(formula)
             if lod_match:
                 return f"LOD Expression ({lod_match.group(1).upper()}) - Not supported in DAX"
         
-        # Check for unsupported functions
-        for func, reason in self.UNSUPPORTED_FUNCTIONS.items():
-            pattern = rf'\b{func}\s*\('
-            if re.search(pattern, formula_upper):
-                return reason
+        # Every unsupported function is a call; skip the scan when there is none
+        if '(' not in formula:
+            return None
+        formula_upper = formula.upper()
+        
+        # Check for unsupported functions in one scan; when several appear,
+        # report the one listed first in UNSUPPORTED_FUNCTIONS
+        found = [m.group(1) for m in self._UNSUPPORTED_PATTERN.finditer(formula_upper)]
+        if found:
+            func = min(found, key=self._UNSUPPORTED_PRIORITY.__getitem__)
+            return self.UNSUPPORTED_FUNCTIONS[func]
         
         return None
     
     def _translate_expression(self, formula: str) -> Tuple[str, ConfidenceLevel]:
         """Translate a Tableau expression to DAX."""
         result = formula
-        confidence = ConfidenceLevel.HIGH
         
         # Replace field references [Field Name] with table qualified references
         result = self._qualify_field_references(result)
         
+        # Every aggregation/function rewrite needs a call, so plain field
+        # references and literals only need the conditional check
+        if '(' not in result:
+            return self._translate_conditionals(self._translate_operators(result))
+        
         # Translate aggregations
         result, agg_conf = self._translate_aggregations(result)
-        if agg_conf.value < confidence.value:
-            confidence = agg_conf
         
         # Translate functions
         result, func_conf = self._translate_functions(result)
-        if func_conf.value < confidence.value:
-            confidence = func_conf
         
         # Translate operators
         result = self._translate_operators(result)
         
         # Translate conditional expressions
         result, cond_conf = self._translate_conditionals(result)
-        if cond_conf.value < confidence.value:
-            confidence = cond_conf
+        
+        # Overall confidence is the weakest stage's
+        confidence = min(agg_conf, func_conf, cond_conf, key=_CONFIDENCE_RANK.__getitem__)
         
         return result, confidence
     
     def _qualify_field_references(self, formula: str) -> str:
         """Add table qualification to field references."""
-        # Pattern to match [FieldName] but not already qualified Table[Field]
-        def replace_field(match):
-            field_name = match.group(1)
-            return f"'{self.table_name}'[{field_name}]"
+        if '[' not in formula:
+            return formula
         
         # Only replace if not already table-qualified
-        result = re.sub(r'(?<!\w)\[([^\]]+)\]', replace_field, formula)
+        result = self._FIELD_PATTERN.sub(self._field_template, formula)
         return result
     
     def _translate_aggregations(self, formula: str) -> Tuple[str, ConfidenceLevel]:
@@ -235,15 +356,17 @@ class CalculationTranslator:
         result = formula
         confidence = ConfidenceLevel.HIGH
         
-        for tableau_agg, (dax_agg, _) in self.AGGREGATION_MAP.items():
+        # Passes for aggregations that are never called are no-ops, so find the
+        # called ones in one scan. (AVG's output is re-matched by the AVERAGE
+        # entry, but that pass only re-strips an already stripped body.)
+        called = {m.lastindex - 1 for m in self._AGG_CALL_PATTERN.finditer(result)}
+        if not called:
+            return result, confidence
+        
+        for i, (pattern, template) in enumerate(self._AGG_PATTERNS):
             # Pattern: AGG([Field])
-            pattern = rf'\b{tableau_agg}\s*\(([^)]+)\)'
-            
-            def replace_agg(match, dax_func=dax_agg):
-                inner = match.group(1).strip()
-                return f'{dax_func}({inner})'
-            
-            result = re.sub(pattern, replace_agg, result, flags=re.IGNORECASE)
+            if i in called:
+                result = pattern.sub(template, result)
         
         return result, confidence
     
@@ -252,16 +375,12 @@ class CalculationTranslator:
         result = formula
         confidence = ConfidenceLevel.HIGH
         
-        for tableau_func, dax_func in self.FUNCTION_MAP.items():
-            if dax_func is None:
-                # Function has no equivalent
-                if re.search(rf'\b{tableau_func}\s*\(', result, re.IGNORECASE):
-                    confidence = ConfidenceLevel.MEDIUM
-                continue
-            
-            # Simple function replacement
-            pattern = rf'\b{tableau_func}\s*\('
-            result = re.sub(pattern, f'{dax_func}(', result, flags=re.IGNORECASE)
+        # Functions with no DAX equivalent
+        if self._FUNC_UNMAPPED_PATTERN.search(result):
+            confidence = ConfidenceLevel.MEDIUM
+        
+        # Simple function replacement, all mapped functions in one pass
+        result = self._FUNC_RENAME_PATTERN.sub(self._FUNC_RENAME_REPL, result)
         
         # Handle special cases
         result = self._handle_special_functions(result)
@@ -273,19 +392,10 @@ class CalculationTranslator:
         result = formula
         
         # ZN([x]) -> IF(ISBLANK([x]), 0, [x])
-        zn_pattern = r'ZN\s*\(([^)]+)\)'
-        def replace_zn(match):
-            expr = match.group(1)
-            return f'IF(ISBLANK({expr}), 0, {expr})'
-        result = re.sub(zn_pattern, replace_zn, result, flags=re.IGNORECASE)
+        result = self._ZN_PATTERN.sub(r'IF(ISBLANK(\1), 0, \1)', result)
         
         # IFNULL(x, y) -> IF(ISBLANK(x), y, x)
-        ifnull_pattern = r'IFNULL\s*\(([^,]+),\s*([^)]+)\)'
-        def replace_ifnull(match):
-            expr = match.group(1)
-            default = match.group(2)
-            return f'IF(ISBLANK({expr}), {default}, {expr})'
-        result = re.sub(ifnull_pattern, replace_ifnull, result, flags=re.IGNORECASE)
+        result = self._IFNULL_PATTERN.sub(r'IF(ISBLANK(\1), \2, \1)', result)
         
         return result
     
@@ -311,7 +421,7 @@ class CalculationTranslator:
         
         # CASE WHEN THEN END -> SWITCH
         # This is complex, mark as medium confidence if present
-        if re.search(r'\bCASE\b', result, re.IGNORECASE):
+        if self._CASE_PATTERN.search(result):
             confidence = ConfidenceLevel.MEDIUM
             # Basic CASE transformation
             # CASE [Field] WHEN 'a' THEN 1 WHEN 'b' THEN 2 ELSE 0 END
@@ -325,14 +435,19 @@ class CalculationTranslator:
         if not formula:
             return AggregationType.NONE
         
-        formula_upper = formula.upper()
-        
-        for agg_name, (_, agg_type) in self.AGGREGATION_MAP.items():
-            if re.search(rf'\b{agg_name}\s*\(', formula_upper):
-                return agg_type
+        # One scan; when several aggregations appear, the first in AGGREGATION_MAP wins
+        found = [m.group(1) for m in self._AGG_TYPE_PATTERN.finditer(formula.upper())]
+        if found:
+            agg_name = min(found, key=self._AGG_PRIORITY.__getitem__)
+            return self.AGGREGATION_MAP[agg_name][1]
         
         return AggregationType.NONE
     
     @property
     def warnings(self) -> List[str]:
         return self._warnings
+
+
+def _translate_one(cls: type, table_name: str, formula: str) -> Tuple[Optional[str], ConfidenceLevel, Optional[str]]:
+    """Translate a single formula in a worker process (module-level so it pickles)."""
+    return cls(table_name).translate(formula)
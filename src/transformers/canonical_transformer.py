@@ -4,9 +4,12 @@ Stage 2: Canonical BI Schema Generator
 Transforms Tableau extracted schema into platform-agnostic canonical schema.
 """
 
+import re
 import uuid
 import hashlib
-from typing import List, Dict, Any, Optional
+import functools
+import itertools
+from typing import List, Dict, Set, Any, Optional
 
 from ..models.tableau_schema import (
     TableauWorkbook, TableauDatasource, TableauWorksheet, TableauDashboard,
@@ -22,6 +25,64 @@ from ..models.canonical_schema import (
 from .calculation_translator import CalculationTranslator
 
 
+# Power BI standard canvas is 1280x720; Tableau dashboards are assumed to be
+# around 1200x800, and zones are scaled proportionally
+_PBI_CANVAS_WIDTH = 1280
+_PBI_CANVAS_HEIGHT = 720
+_ZONE_SCALE_X = _PBI_CANVAS_WIDTH / 1200
+_ZONE_SCALE_Y = _PBI_CANVAS_HEIGHT / 800
+
+# Name sanitization for ASCII names in one pass: spaces become '_', everything
+# else but alnum, '_' and '-' is dropped
+_ASCII_SANITIZE_TABLE = {
+    i: None for i in range(128)
+    if not (chr(i).isalnum() or chr(i) in '_-')
+}
+_ASCII_SANITIZE_TABLE[ord(' ')] = '_'
+
+
+@functools.lru_cache(maxsize=1024)
+def _md5_page_id(name: str) -> str:
+    """Legacy 20-character page ID (first half of the MD5 hex digest)."""
+    return hashlib.md5(name.encode()).hexdigest()[:20]
+
+
+@functools.lru_cache(maxsize=1024)
+def _blake2b_page_id(name: str) -> str:
+    """20-character page ID from a 10-byte BLAKE2b digest."""
+    return hashlib.blake2b(name.encode(), digest_size=10).hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _uuid5_visual_id(name: str) -> str:
+    """32-character visual ID (name-based UUID5 without dashes)."""
+    return uuid.uuid5(uuid.NAMESPACE_DNS, name).hex
+
+
+@functools.lru_cache(maxsize=4096)
+def _sanitize_name_cached(name: str) -> str:
+    """Sanitize a name for use in Power BI (memoized; names repeat across shelves)."""
+    if not name:
+        return "Unnamed"
+
+    # Remove or replace invalid characters
+    if name.isascii():
+        sanitized = name.translate(_ASCII_SANITIZE_TABLE)
+    else:
+        sanitized = name.replace(' ', '_')
+        sanitized = ''.join(c for c in sanitized if c.isalnum() or c in '_-')
+
+    # Ensure it doesn't start with a number
+    if sanitized and sanitized[0].isdigit():
+        sanitized = '_' + sanitized
+
+    # Ensure not empty
+    if not sanitized:
+        sanitized = "Field"
+
+    return sanitized
+
+
 class CanonicalTransformer:
     """
     Transforms Tableau workbook schema to canonical BI schema.
@@ -62,14 +123,37 @@ class CanonicalTransformer:
         TableauDataType.UNKNOWN: DataType.STRING,
     }
     
-    def __init__(self):
+    # Name fragments that suggest a numeric (measure) field, matched on the
+    # lowercased name so folding follows str.lower() exactly
+    _NUMERIC_INDICATOR_PATTERN = re.compile(
+        r'sum|avg|count|sales|profit|quantity|revenue|amount|total|price'
+    )
+    
+    def __init__(self, blake2b_page_ids: bool = False):
+        # MD5 stays the default so IDs of previously generated projects don't change
+        self._page_id = _blake2b_page_id if blake2b_page_ids else _md5_page_id
+        # Bound lookups reused for every column and worksheet
+        self._dt_get = self.DATA_TYPE_MAP.get
+        self._vt_get = self.VISUAL_TYPE_MAP.get
+        # Sanitizes names for use in Power BI
+        self._sanitize = _sanitize_name_cached
+        self._reset_state()
+    
+    def _reset_state(self):
+        """Start fresh per-workbook tracking (new lists, since reports keep references)."""
         self.warnings: List[str] = []
+        # Category lists are also bound directly for the append sites
+        self._uf_lod: List[str] = []
+        self._uf_table_calc: List[str] = []
+        self._uf_dual_axis: List[str] = []
+        self._uf_other: List[str] = []
         self.unsupported_features: Dict[str, List[str]] = {
-            'lod_expressions': [],
-            'table_calculations': [],
-            'dual_axis_charts': [],
-            'other': []
+            'lod_expressions': self._uf_lod,
+            'table_calculations': self._uf_table_calc,
+            'dual_axis_charts': self._uf_dual_axis,
+            'other': self._uf_other
         }
+        self._primary_table_name = "Data"
     
     def transform(self, workbook: TableauWorkbook) -> CanonicalReport:
         """
@@ -81,6 +165,9 @@ class CanonicalTransformer:
         Returns:
             CanonicalReport with platform-agnostic representation
         """
+        # A transformer may be reused across workbooks
+        self._reset_state()
+        
         # Create dataset from datasources
         dataset = self._create_dataset(workbook)
         
@@ -109,51 +196,68 @@ class CanonicalTransformer:
         # Process each datasource
         for ds in workbook.datasources:
             tables, measures = self._process_datasource(ds)
-            dataset.tables.extend(tables)
+            for table in tables:
+                dataset.add_table(table)
         
         # If no tables, create a placeholder
         if not dataset.tables:
-            dataset.tables.append(self._create_placeholder_table(workbook))
+            dataset.add_table(self._create_placeholder_table(workbook))
+        
+        # Encodings reference the first (already sanitized) table
+        self._primary_table_name = dataset.tables[0].name
         
         return dataset
     
     def _process_datasource(self, datasource: TableauDatasource) -> tuple:
         """Process a single Tableau datasource into tables and measures."""
-        tables = []
+        tables = [self._convert_table(t, datasource) for t in datasource.tables]
         all_measures = []
+        lod_fields = []
+        table_calc_fields = []
         
-        for tableau_table in datasource.tables:
-            canonical_table = self._convert_table(tableau_table, datasource)
-            tables.append(canonical_table)
+        # One translator per datasource; fields are qualified with its first table
+        table_name = datasource.tables[0].name if datasource.tables else "Data"
+        translator = CalculationTranslator(table_name=self._sanitize(table_name))
         
         # Process calculated fields into measures
         for calc_field in datasource.calculated_fields:
-            measure = self._convert_calculated_field(calc_field, datasource)
+            measure = self._convert_calculated_field(calc_field, translator)
             if measure:
-                # Add measure to the first table or create a measures table
-                if tables:
-                    tables[0].measures.append(measure)
                 all_measures.append(measure)
+                
+                # Track unsupported features
+                if calc_field.calculation_type == CalculationType.LOD:
+                    lod_fields.append(calc_field.name)
+                elif calc_field.calculation_type == CalculationType.TABLE_CALC:
+                    table_calc_fields.append(calc_field.name)
+        
+        # Add measures to the first table
+        if tables:
+            tables[0].measures.extend(all_measures)
+        self._uf_lod.extend(lod_fields)
+        self._uf_table_calc.extend(table_calc_fields)
         
         return tables, all_measures
     
     def _convert_table(self, tableau_table: TableauColumn, datasource: TableauDatasource) -> CanonicalTable:
         """Convert a Tableau table to canonical table."""
+        sanitize = self._sanitize
+        dt_get = self._dt_get
         canonical_table = CanonicalTable(
-            name=self._sanitize_name(tableau_table.name),
+            name=sanitize(tableau_table.name),
             display_name=tableau_table.display_name,
+            columns=[
+                CanonicalColumn(
+                    name=sanitize(col.name),
+                    display_name=col.display_name,
+                    data_type=dt_get(col.datatype, DataType.STRING),
+                    source_column=col.name
+                )
+                for col in tableau_table.columns
+            ],
             source_table=tableau_table.name
         )
         
-        for col in tableau_table.columns:
-            canonical_col = CanonicalColumn(
-                name=self._sanitize_name(col.name),
-                display_name=col.display_name,
-                data_type=self.DATA_TYPE_MAP.get(col.datatype, DataType.STRING),
-                source_column=col.name
-            )
-            canonical_table.columns.append(canonical_col)
-        
         # Ensure table has at least one column
         if not canonical_table.columns:
             canonical_table.columns.append(CanonicalColumn(
@@ -164,25 +268,16 @@ class CanonicalTransformer:
         
         return canonical_table
     
-    def _convert_calculated_field(self, calc_field: TableauColumn, datasource: TableauDatasource) -> Optional[CanonicalMeasure]:
+    def _convert_calculated_field(self, calc_field: TableauColumn,
+                                  translator: CalculationTranslator) -> Optional[CanonicalMeasure]:
         """Convert a Tableau calculated field to a canonical measure."""
         if not calc_field.calculation:
             return None
         
-        # Get the table name for field qualification
-        table_name = datasource.tables[0].name if datasource.tables else "Data"
-        
-        translator = CalculationTranslator(table_name=self._sanitize_name(table_name))
         dax_expr, confidence, unsupported_reason = translator.translate(calc_field.calculation)
         
-        # Track unsupported features
-        if calc_field.calculation_type == CalculationType.LOD:
-            self.unsupported_features['lod_expressions'].append(calc_field.name)
-        elif calc_field.calculation_type == CalculationType.TABLE_CALC:
-            self.unsupported_features['table_calculations'].append(calc_field.name)
-        
         measure = CanonicalMeasure(
-            name=self._sanitize_name(calc_field.name),
+            name=self._sanitize(calc_field.name),
             display_name=calc_field.display_name,
             expression=calc_field.calculation,
             dax_expression=dax_expr,
@@ -195,23 +290,26 @@ class CanonicalTransformer:
     
     def _create_placeholder_table(self, workbook: TableauWorkbook) -> CanonicalTable:
         """Create a placeholder table when no datasources are found."""
-        # Collect all field references from worksheets
-        fields_seen = set()
-        
-        for ws in workbook.worksheets:
-            fields_seen.update(ws.rows)
-            fields_seen.update(ws.columns)
-            for mark_fields in ws.marks.values():
-                fields_seen.update(mark_fields)
-        
-        # Create columns from field references
         columns = []
-        for field_name in fields_seen:
-            columns.append(CanonicalColumn(
-                name=self._sanitize_name(field_name),
-                display_name=field_name,
-                data_type=DataType.STRING
-            ))
+        
+        # Without worksheets there are no field references to collect
+        if workbook.worksheets:
+            # Collect all field references from worksheets
+            fields_seen = set()
+            
+            for ws in workbook.worksheets:
+                fields_seen.update(ws.rows, ws.columns, *ws.marks.values())
+            
+            # Create columns from field references
+            sanitize = self._sanitize
+            columns = [
+                CanonicalColumn(
+                    name=sanitize(field_name),
+                    display_name=field_name,
+                    data_type=DataType.STRING
+                )
+                for field_name in fields_seen
+            ]
         
         # Ensure at least one column
         if not columns:
@@ -262,7 +360,7 @@ class CanonicalTransformer:
         
         page = CanonicalPage(
             id=page_id,
-            name=self._sanitize_name(dashboard.name),
+            name=self._sanitize(dashboard.name),
             display_name=dashboard.title or dashboard.name,
             width=min(dashboard.width, 1920),
             height=min(dashboard.height, 1080),
@@ -295,7 +393,7 @@ class CanonicalTransformer:
         
         page = CanonicalPage(
             id=page_id,
-            name=self._sanitize_name(worksheet.name),
+            name=self._sanitize(worksheet.name),
             display_name=worksheet.title or worksheet.name,
             width=1280,
             height=720
@@ -310,7 +408,7 @@ class CanonicalTransformer:
                                      zone: Any, dataset: CanonicalDataset) -> CanonicalVisual:
         """Convert a worksheet placed in a dashboard zone to a visual."""
         visual_id = self._generate_visual_id(worksheet.name)
-        visual_type = self.VISUAL_TYPE_MAP.get(worksheet.visual_type, VisualType.TABLE)
+        visual_type = self._vt_get(worksheet.visual_type, VisualType.TABLE)
         
         # Check for unsupported features
         unsupported = []
@@ -318,12 +416,15 @@ class CanonicalTransformer:
         
         if worksheet.is_dual_axis:
             unsupported.append("Dual-axis chart - converted to single axis")
-            self.unsupported_features['dual_axis_charts'].append(worksheet.name)
+            self._uf_dual_axis.append(worksheet.name)
             confidence = ConfidenceLevel.MEDIUM
         
         # Scale zone coordinates to fit Power BI canvas
         x, y, width, height = self._scale_zone_position(zone)
         
+        # Encodings from field references
+        category, values, series, tooltip = self._build_visual_encodings(worksheet, dataset)
+        
         visual = CanonicalVisual(
             id=visual_id,
             name=worksheet.name,
@@ -333,21 +434,22 @@ class CanonicalTransformer:
             width=width,
             height=height,
             title=worksheet.title or worksheet.name,
+            category=category,
+            values=values,
+            series=series,
+            tooltip=tooltip,
             source_worksheet=worksheet.name,
             confidence=confidence,
             unsupported_features=unsupported
         )
         
-        # Set encodings from field references
-        self._set_visual_encodings(visual, worksheet, dataset)
-        
         return visual
     
     def _create_visual_from_worksheet(self, worksheet: TableauWorksheet, 
                                       dataset: CanonicalDataset, index: int) -> CanonicalVisual:
         """Create a visual from a worksheet without zone positioning."""
         visual_id = self._generate_visual_id(worksheet.name)
-        visual_type = self.VISUAL_TYPE_MAP.get(worksheet.visual_type, VisualType.TABLE)
+        visual_type = self._vt_get(worksheet.visual_type, VisualType.TABLE)
         
         # Calculate position based on index (grid layout)
         cols_per_row = 2
@@ -366,6 +468,8 @@ class CanonicalTransformer:
             unsupported.append("Dual-axis chart")
             confidence = ConfidenceLevel.MEDIUM
         
+        category, values, series, tooltip = self._build_visual_encodings(worksheet, dataset)
+        
         visual = CanonicalVisual(
             id=visual_id,
             name=worksheet.name,
@@ -375,131 +479,107 @@ class CanonicalTransformer:
             width=width,
             height=height,
             title=worksheet.title or worksheet.name,
+            category=category,
+            values=values,
+            series=series,
+            tooltip=tooltip,
             source_worksheet=worksheet.name,
             confidence=confidence,
             unsupported_features=unsupported
         )
         
-        self._set_visual_encodings(visual, worksheet, dataset)
-        
         return visual
     
-    def _set_visual_encodings(self, visual: CanonicalVisual, 
-                              worksheet: TableauWorksheet, dataset: CanonicalDataset):
-        """Set visual encodings from worksheet field references."""
-        # Get the primary table name
-        table_name = dataset.tables[0].name if dataset.tables else "Data"
+    def _build_visual_encodings(self, worksheet: TableauWorksheet,
+                                dataset: CanonicalDataset) -> tuple:
+        """Build (category, values, series, tooltip) encodings from worksheet field references."""
+        # Primary table name (resolved once in _create_dataset)
+        table_name = self._primary_table_name
+        
+        # Only tooltip and color marks become encodings
+        marks = worksheet.marks
+        tooltip_fields = marks.get('tooltip', ())
+        color_fields = marks.get('color', ())
+        
+        # Sanitize each distinct field once; rows, columns and marks often overlap
+        sanitize = self._sanitize
+        sanitized = {
+            f: sanitize(f) for f in itertools.chain(
+                worksheet.rows, worksheet.columns, tooltip_fields, color_fields
+            )
+        }
+        
+        # Encodings are built positionally:
+        # (field_name, table_name, aggregation, is_measure)
+        enc = VisualEncoding
+        no_agg = AggregationType.NONE
         
         # Rows go to category axis for most chart types
-        for field in worksheet.rows:
-            encoding = VisualEncoding(
-                field_name=self._sanitize_name(field),
-                table_name=table_name,
-                is_measure=False
-            )
-            visual.category.append(encoding)
+        category = [enc(sanitized[f], table_name, no_agg, False) for f in worksheet.rows]
+        values = []
+        series = []
         
         # Columns often contain measures
+        # (shelf aggregations and measure names are indexed once per worksheet)
+        aggregated_fields = {
+            f.get('name') for shelf in worksheet.shelves
+            for f in shelf.fields if f.get('aggregation')
+        }
+        measure_names = {m.name for t in dataset.tables for m in t.measures}
         for field in worksheet.columns:
             # Check if this is a measure
-            is_measure = self._is_measure_field(field, worksheet, dataset)
-            encoding = VisualEncoding(
-                field_name=self._sanitize_name(field),
-                table_name=table_name,
-                is_measure=is_measure,
-                aggregation=AggregationType.SUM if is_measure else AggregationType.NONE
+            is_measure = self._is_measure_field(
+                field, sanitized[field], aggregated_fields, measure_names
             )
             if is_measure:
-                visual.values.append(encoding)
+                values.append(enc(sanitized[field], table_name, AggregationType.SUM, True))
             else:
-                visual.series.append(encoding)
-        
-        # Process mark encodings
-        for enc_type, fields in worksheet.marks.items():
-            for field in fields:
-                encoding = VisualEncoding(
-                    field_name=self._sanitize_name(field),
-                    table_name=table_name
-                )
-                if enc_type == 'tooltip':
-                    visual.tooltip.append(encoding)
-                elif enc_type == 'color':
-                    visual.series.append(encoding)
+                series.append(enc(sanitized[field], table_name, no_agg, False))
+        
+        # Process mark encodings (in the worksheet's mark order)
+        tooltip = []
+        for enc_type, fields in marks.items():
+            if enc_type == 'tooltip':
+                target = tooltip
+            elif enc_type == 'color':
+                target = series
+            else:
+                continue
+            target.extend(enc(sanitized[f], table_name) for f in fields)
+        
+        return category, values, series, tooltip
     
-    def _is_measure_field(self, field_name: str, worksheet: TableauWorksheet, 
-                          dataset: CanonicalDataset) -> bool:
+    def _is_measure_field(self, field_name: str, sanitized_name: str,
+                          aggregated_fields: Set[str], measure_names: Set[str]) -> bool:
         """Determine if a field is a measure."""
         # Check if field has aggregation in shelves
-        for shelf in worksheet.shelves:
-            for f in shelf.fields:
-                if f.get('name') == field_name and f.get('aggregation'):
-                    return True
+        if field_name in aggregated_fields:
+            return True
         
         # Check if it's in the dataset measures
-        for table in dataset.tables:
-            for measure in table.measures:
-                if measure.name == self._sanitize_name(field_name):
-                    return True
+        if sanitized_name in measure_names:
+            return True
         
         # Default: assume numeric-looking fields are measures
-        numeric_indicators = ['sum', 'avg', 'count', 'sales', 'profit', 'quantity', 
-                             'revenue', 'amount', 'total', 'price']
-        return any(ind in field_name.lower() for ind in numeric_indicators)
+        return self._NUMERIC_INDICATOR_PATTERN.search(field_name.lower()) is not None
     
     def _scale_zone_position(self, zone) -> tuple:
         """Scale zone position to Power BI canvas coordinates."""
-        # Power BI standard canvas is 1280x720
-        # Scale proportionally
-        pbi_width = 1280
-        pbi_height = 720
-        
-        # Assume Tableau dashboard is around 1200x800 if not specified
-        tb_width = 1200
-        tb_height = 800
-        
-        scale_x = pbi_width / tb_width
-        scale_y = pbi_height / tb_height
-        
-        x = int(zone.x * scale_x)
-        y = int(zone.y * scale_y)
-        width = int(zone.width * scale_x)
-        height = int(zone.height * scale_y)
-        
         # Ensure minimum sizes
-        width = max(width, 100)
-        height = max(height, 100)
+        width = max(int(zone.width * _ZONE_SCALE_X), 100)
+        height = max(int(zone.height * _ZONE_SCALE_Y), 100)
         
         # Ensure within canvas bounds
-        x = min(x, pbi_width - width)
-        y = min(y, pbi_height - height)
+        x = min(int(zone.x * _ZONE_SCALE_X), _PBI_CANVAS_WIDTH - width)
+        y = min(int(zone.y * _ZONE_SCALE_Y), _PBI_CANVAS_HEIGHT - height)
         
         return x, y, width, height
     
-    def _sanitize_name(self, name: str) -> str:
-        """Sanitize a name for use in Power BI."""
-        if not name:
-            return "Unnamed"
-        
-        # Remove or replace invalid characters
-        sanitized = name.replace(' ', '_')
-        sanitized = ''.join(c for c in sanitized if c.isalnum() or c in '_-')
-        
-        # Ensure it doesn't start with a number
-        if sanitized and sanitized[0].isdigit():
-            sanitized = '_' + sanitized
-        
-        # Ensure not empty
-        if not sanitized:
-            sanitized = "Field"
-        
-        return sanitized
-    
     def _generate_page_id(self, name: str) -> str:
         """Generate a deterministic page ID."""
         # Power BI uses 20-character hex IDs
-        hash_bytes = hashlib.md5(name.encode()).hexdigest()
-        return hash_bytes[:20]
+        return self._page_id(name)
     
     def _generate_visual_id(self, name: str) -> str:
         """Generate a deterministic visual ID."""
-        return str(uuid.uuid5(uuid.NAMESPACE_DNS, name)).replace('-', '')[:32]
+        return _uuid5_visual_id(name)
@@ -9,6 +9,7 @@ import os
 import sys
 import shutil
 import tempfile
+import dataclasses
 
 # Add parent to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -16,6 +17,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from src.pipeline import migrate, PipelineConfig, MigrationPipeline
 from src.extractors.tableau_extractor import TableauExtractor
 from src.transformers.canonical_transformer import CanonicalTransformer
+from src.transformers import calculation_translator
+from src.transformers.calculation_translator import CalculationTranslator
+from src.models.canonical_schema import CanonicalDataset, CanonicalTable, ConfidenceLevel
+from src.models.powerbi_schema import PBISemanticModel, PBITable
+from src.models.tableau_schema import (
+    TableauWorkbook, TableauWorksheet, TableauDatasource, TableauDashboard, TableauDashboardZone
+)
 
 
 def test_tableau_extraction():
@@ -224,6 +232,377 @@ def test_full_migration():
         pass
 
 
+def test_table_lookup_after_append():
+    """Test that name lookups see items appended after an earlier lookup."""
+    print("\n" + "="*60)
+    print("TEST: Name Lookups After Append")
+    print("="*60)
+    
+    try:
+        dataset = CanonicalDataset(name="Model")
+        assert dataset.get_table_by_name("Orders") is None
+        
+        # Appended directly to the list, bypassing add_table()
+        orders = CanonicalTable(name="Orders", display_name="Orders")
+        dataset.tables.append(orders)
+        assert dataset.get_table_by_name("Orders") is orders, "Directly appended table not found"
+        
+        # Appended through add_table() after the index exists
+        people = CanonicalTable(name="People", display_name="People")
+        dataset.add_table(people)
+        assert dataset.get_table_by_name("People") is people, "add_table() table not found"
+        
+        # First table wins for duplicate names, like a linear scan
+        dataset.tables.append(CanonicalTable(name="Orders", display_name="Orders 2"))
+        assert dataset.get_table_by_name("Orders") is orders, "Duplicate name shadowed first table"
+        
+        print("✓ Lookups stay in sync with the table list")
+        
+        # Power BI model tables share the same index helper
+        model = PBISemanticModel(name="Model")
+        assert model.get_table_by_name("Orders") is None
+        pbi_orders = PBITable(name="Orders")
+        model.tables.append(pbi_orders)
+        assert model.get_table_by_name("Orders") is pbi_orders, "PBI table not found after append"
+        
+        # Workbook lookups follow appends and reassigned lists
+        workbook = TableauWorkbook(name="Book")
+        assert workbook.get_worksheet_by_name("Sheet 1") is None
+        sheet = TableauWorksheet(name="Sheet 1")
+        workbook.worksheets.append(sheet)
+        assert workbook.get_worksheet_by_name("Sheet 1") is sheet, "Worksheet not found after append"
+        
+        assert workbook.get_datasource_by_name("Sales") is None
+        datasource = TableauDatasource(name="federated.1", caption="Sales")
+        workbook.datasources = [datasource]
+        assert workbook.get_datasource_by_name("Sales") is datasource, "Datasource caption not found"
+        assert workbook.get_datasource_by_name("federated.1") is datasource, "Datasource name not found"
+        
+        print("✓ Power BI model and workbook lookups stay in sync")
+        
+        # The indexes are not dataclass fields
+        for obj in (dataset, model, workbook):
+            names = [f.name for f in dataclasses.fields(obj)]
+            assert not any(n.endswith('_index') for n in names), f"Index exposed as a field: {names}"
+            assert dataclasses.asdict(obj).keys() == set(names), "asdict() includes extra keys"
+        assert dataset == CanonicalDataset(name="Model", tables=list(dataset.tables)), \
+            "Index state affects equality"
+        
+        print("✓ Indexes stay out of fields() and asdict()")
+        print("\n✓ Table Lookup PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Table Lookup FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_translation_confidence():
+    """Test that the weakest translation stage sets the overall confidence."""
+    print("\n" + "="*60)
+    print("TEST: Translation Confidence")
+    print("="*60)
+    
+    cases = [
+        ("SUM([Sales])", ConfidenceLevel.HIGH),
+        ("[Sales] * 2", ConfidenceLevel.HIGH),
+        # CASE needs manual conversion to SWITCH (both with and without calls)
+        ('CASE [Region] WHEN "East" THEN 1 ELSE 0 END', ConfidenceLevel.MEDIUM),
+        ('CASE [Region] WHEN "East" THEN SUM([Sales]) END', ConfidenceLevel.MEDIUM),
+        # Functions without a direct DAX equivalent
+        ('SPLIT([Name], " ", 1)', ConfidenceLevel.MEDIUM),
+        ('DATEPART("year", [Order Date])', ConfidenceLevel.MEDIUM),
+        ("{FIXED [Region]: SUM([Sales])}", ConfidenceLevel.UNSUPPORTED),
+    ]
+    
+    try:
+        translator = CalculationTranslator(table_name="Orders")
+        for formula, expected in cases:
+            _, confidence, _ = translator.translate(formula)
+            assert confidence == expected, f"{formula!r}: expected {expected.value}, got {confidence.value}"
+            print(f"✓ [{confidence.value}] {formula}")
+        
+        print("\n✓ Translation Confidence PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Translation Confidence FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_intermediate_skip_unchanged():
+    """Test that unchanged canonical JSON is not rewritten, and changes are."""
+    print("\n" + "="*60)
+    print("TEST: Intermediate JSON Skip-If-Unchanged")
+    print("="*60)
+    
+    sample_twb = os.path.join(
+        os.path.dirname(__file__), 
+        'sample_data', 
+        'sample_workbook.twb'
+    )
+    output_dir = tempfile.mkdtemp(prefix='pbip_intermediate_test_')
+    
+    try:
+        extractor = TableauExtractor(sample_twb)
+        workbook = extractor.extract()
+        extractor.cleanup()
+        report = CanonicalTransformer().transform(workbook)
+        
+        pipeline = MigrationPipeline(PipelineConfig(
+            input_path=sample_twb, output_path=output_dir, verbose=False
+        ))
+        json_path = os.path.join(output_dir, 'intermediate', 'sample_canonical.json')
+        sha_path = json_path + '.sha'
+        
+        def save():
+            pipeline._save_canonical_schema(report, 'sample')
+        
+        def backdate():
+            # Old timestamps make a rewrite visible; sidecar no older than data
+            os.utime(json_path, (1000000000, 1000000000))
+            os.utime(sha_path, (1000000000, 1000000000))
+        
+        def rewritten() -> bool:
+            return os.path.getmtime(json_path) != 1000000000
+        
+        save()
+        assert os.path.exists(json_path), "Canonical JSON not written"
+        assert os.path.exists(sha_path), "Digest sidecar not written"
+        with open(json_path, 'rb') as f:
+            original = f.read()
+        
+        # Identical rerun: skipped
+        backdate()
+        save()
+        assert not rewritten(), "Unchanged JSON was rewritten"
+        print("✓ Identical rerun skips the write")
+        
+        # Changed content: rewritten, sidecar updated
+        backdate()
+        report.name = "sample_renamed"
+        save()
+        assert rewritten(), "Changed JSON was not rewritten"
+        with open(json_path, 'rb') as f:
+            assert b'sample_renamed' in f.read(), "Rewritten JSON has stale content"
+        backdate()
+        save()
+        assert not rewritten(), "Sidecar not updated after rewrite"
+        print("✓ Changed content is rewritten")
+        
+        # Missing sidecar: rewritten and recreated
+        os.remove(sha_path)
+        save()
+        assert rewritten(), "JSON not rewritten without a sidecar"
+        assert os.path.exists(sha_path), "Sidecar not recreated"
+        print("✓ Missing sidecar forces a rewrite")
+        
+        # Data file edited after its sidecar (mtime guard): rewritten
+        backdate()
+        with open(json_path, 'wb') as f:
+            f.write(b'{}')
+        os.utime(json_path, (1000000100, 1000000100))
+        save()
+        with open(json_path, 'rb') as f:
+            restored = f.read()
+        assert restored != b'{}', "Hand-edited JSON newer than its sidecar was kept"
+        report.name = workbook.name
+        save()
+        with open(json_path, 'rb') as f:
+            assert f.read() == original, "Restored JSON differs from the original"
+        print("✓ JSON newer than its sidecar is rewritten")
+        
+        print("\n✓ Intermediate Skip PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Intermediate Skip FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def test_transformer_reuse():
+    """Test that one transformer reused across workbooks matches fresh instances."""
+    print("\n" + "="*60)
+    print("TEST: Transformer Reuse Across Workbooks")
+    print("="*60)
+    
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workbook_paths = [
+        os.path.join(base_dir, 'Superstore.twbx'),
+        os.path.join(base_dir, 'tests', 'sample_data', 'sample_workbook.twb'),
+    ]
+    workbook_paths = [p for p in workbook_paths if os.path.exists(p)]
+    
+    try:
+        workbooks = []
+        for path in workbook_paths:
+            extractor = TableauExtractor(path)
+            workbooks.append(extractor.extract())
+            extractor.cleanup()
+        assert len(workbooks) >= 1, "No sample workbooks found"
+        
+        # A dashboard with a dual-axis sheet also exercises unsupported-feature tracking
+        dual_axis = TableauWorkbook(
+            name="DualAxis",
+            worksheets=[
+                TableauWorksheet(name="Combo", is_dual_axis=True, rows=["Region"], columns=["Sales"])
+            ],
+            dashboards=[
+                TableauDashboard(name="Overview", zones=[
+                    TableauDashboardZone(zone_id="1", zone_type="viz", worksheet_name="Combo")
+                ])
+            ]
+        )
+        workbooks.append(dual_axis)
+        
+        fresh = [CanonicalTransformer().transform(wb) for wb in workbooks]
+        
+        shared = CanonicalTransformer()
+        reused = [shared.transform(wb) for wb in workbooks]
+        
+        for wb, expected, actual in zip(workbooks, fresh, reused):
+            assert actual == expected, f"Reused transformer output differs for {wb.name}"
+            assert actual.visual_count == expected.visual_count, f"Visual count differs for {wb.name}"
+            print(f"✓ {wb.name}: matches a fresh transformer")
+        
+        # Earlier reports keep their own tracking lists
+        assert reused[0].migration_warnings is not reused[-1].migration_warnings
+        assert reused[0].unsupported_features is not reused[-1].unsupported_features
+        assert reused[0].unsupported_features == fresh[0].unsupported_features, \
+            "Earlier report's unsupported features changed by a later run"
+        print("✓ Earlier reports are not affected by later runs")
+        
+        print("\n✓ Transformer Reuse PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Transformer Reuse FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_translate_many():
+    """Test that batch translation matches per-formula translation."""
+    print("\n" + "="*60)
+    print("TEST: Batch Formula Translation")
+    print("="*60)
+    
+    formulas = [
+        "SUM([Sales])",
+        'CASE [Region] WHEN "East" THEN 1 ELSE 0 END',
+        "{FIXED [Region]: SUM([Sales])}",
+        "RUNNING_SUM(SUM([Sales]))",
+        "SUM([Sales])",  # duplicate
+        "",
+        'IFNULL([Profit], 0) + ZN([Discount])',
+        "RUNNING_SUM(SUM([Sales]))",  # duplicate
+        "[Sales] * 2",
+    ]
+    
+    try:
+        translator = CalculationTranslator(table_name="Orders")
+        expected = []
+        for formula in formulas:
+            expected.append(translator.translate(formula))
+            assert translator.warnings == [], f"Unexpected warnings for {formula!r}"
+        
+        serial = CalculationTranslator.translate_many(formulas, table_name="Orders", workers=1)
+        assert serial == expected, "Serial batch differs from per-formula translate()"
+        assert len(serial) == len(formulas), "Batch dropped duplicate formulas"
+        print(f"✓ Serial batch matches translate() for {len(formulas)} formulas")
+        
+        # An explicit worker count uses the process pool even for a small batch
+        parallel = CalculationTranslator.translate_many(formulas, table_name="Orders", workers=2)
+        assert parallel == expected, "Parallel batch differs from per-formula translate()"
+        print("✓ Process-pool batch matches translate(), duplicates included")
+        
+        # The default picks serial or parallel by batch size
+        threshold = calculation_translator._PARALLEL_MIN_FORMULAS
+        calculation_translator._PARALLEL_MIN_FORMULAS = 2
+        try:
+            auto = CalculationTranslator.translate_many(formulas, table_name="Orders")
+        finally:
+            calculation_translator._PARALLEL_MIN_FORMULAS = threshold
+        assert auto == expected, "Default batch differs from per-formula translate()"
+        assert CalculationTranslator.translate_many(formulas, table_name="Orders") == expected, \
+            "Small default batch differs from per-formula translate()"
+        print("✓ Default worker selection matches translate()")
+        
+        # Unsupported reasons (the per-formula warnings) come through unchanged
+        reasons = [r[2] for r in parallel]
+        assert reasons[2] and "LOD" in reasons[2], "LOD reason missing from batch result"
+        assert reasons[3] == reasons[7] and reasons[3], "Table calc reason missing for duplicate"
+        print("✓ Unsupported reasons preserved")
+        
+        print("\n✓ Batch Translation PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ Batch Translation FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
+def test_blake2b_page_ids():
+    """Test that BLAKE2b page IDs are deterministic and differ from the MD5 default."""
+    print("\n" + "="*60)
+    print("TEST: BLAKE2b Page IDs")
+    print("="*60)
+    
+    workbook = TableauWorkbook(
+        name="PageIds",
+        worksheets=[
+            TableauWorksheet(name="Sales by Region", rows=["Region"], columns=["Sales"]),
+            TableauWorksheet(name="Profit Trend", rows=["Profit"], columns=["Order Date"]),
+        ],
+        dashboards=[
+            TableauDashboard(name="Overview", zones=[
+                TableauDashboardZone(zone_id="1", zone_type="viz", worksheet_name="Sales by Region")
+            ]),
+            TableauDashboard(name="Trends", zones=[
+                TableauDashboardZone(zone_id="1", zone_type="viz", worksheet_name="Profit Trend")
+            ])
+        ]
+    )
+    
+    try:
+        def page_ids(transformer):
+            return [page.id for page in transformer.transform(workbook).pages]
+        
+        md5_ids = page_ids(CanonicalTransformer())
+        blake_ids = page_ids(CanonicalTransformer(blake2b_page_ids=True))
+        assert len(blake_ids) == len(md5_ids) > 1, "Expected several pages"
+        
+        assert blake_ids == page_ids(CanonicalTransformer(blake2b_page_ids=True)), \
+            "BLAKE2b page IDs are not deterministic"
+        assert all(len(pid) == 20 for pid in blake_ids), "BLAKE2b page IDs are not 20 characters"
+        assert len(set(blake_ids)) == len(blake_ids), "BLAKE2b page IDs collide"
+        print(f"✓ BLAKE2b page IDs stable across runs: {blake_ids}")
+        
+        assert md5_ids == page_ids(CanonicalTransformer()), "MD5 page IDs are not deterministic"
+        assert not set(md5_ids) & set(blake_ids), "BLAKE2b page IDs match the MD5 default"
+        print("✓ BLAKE2b page IDs differ from the MD5 default")
+        
+        print("\n✓ BLAKE2b Page IDs PASSED")
+        return True
+        
+    except Exception as e:
+        print(f"✗ BLAKE2b Page IDs FAILED: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Run all tests."""
     print("""
@@ -238,6 +617,12 @@ def main():
     results.append(("Stage 1: Tableau Extraction", test_tableau_extraction()))
     results.append(("Stage 2: Canonical Transformation", test_canonical_transformation()))
     results.append(("Full Migration Pipeline", test_full_migration()))
+    results.append(("Name Lookups After Append", test_table_lookup_after_append()))
+    results.append(("Translation Confidence", test_translation_confidence()))
+    results.append(("Intermediate JSON Skip-If-Unchanged", test_intermediate_skip_unchanged()))
+    results.append(("Transformer Reuse Across Workbooks", test_transformer_reuse()))
+    results.append(("Batch Formula Translation", test_translate_many()))
+    results.append(("BLAKE2b Page IDs", test_blake2b_page_ids()))
     
     # Summary
     print("\n" + "="*60)